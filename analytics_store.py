@@ -0,0 +1,392 @@
+import os
+import re
+import json
+import glob
+import uuid
+import time
+import threading
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from career_models import NIVEIS_SENIORIDADE, normalize_seniority as _normalize_seniority, coerce_number
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = pa.schema([
+    ("analysis_id", pa.string()),
+    ("created_at", pa.timestamp("s", tz="UTC")),
+    ("profissao", pa.string()),
+    ("nivel_confianca", pa.string()),
+    ("senioridade", pa.string()),
+    ("anos_experiencia", pa.float32()),
+    ("proximo_cargo", pa.string()),
+    ("probabilidade_proximo", pa.string()),
+    ("lacunas_tecnicas", pa.list_(pa.string())),
+    ("lacunas_comportamentais", pa.list_(pa.string())),
+    ("n_lacunas", pa.int16()),
+])
+
+
+def _coerce_years(value: Any) -> Optional[float]:
+    years = coerce_number(value)
+    return float(years) if years is not None else None
+
+
+def _normalize_label(value: Any) -> Optional[str]:
+    if not value or not isinstance(value, str):
+        return None
+    return re.sub(r'\s+', ' ', value).strip()
+
+
+def flatten_analysis(analysis: Dict[str, Any], analysis_id: str = None,
+                     created_at: datetime = None) -> Dict[str, Any]:
+    prof = analysis.get('profissao_real') or {}
+    sen = analysis.get('nivel_senioridade') or {}
+    lac = analysis.get('lacunas') or {}
+    prox = analysis.get('proximo_cargo') or {}
+
+    tecnicas = [_normalize_label(g.get('skill')) for g in lac.get('tecnicas') or [] if isinstance(g, dict)]
+    comportamentais = [_normalize_label(g.get('competencia')) for g in lac.get('comportamentais') or [] if isinstance(g, dict)]
+    tecnicas = [t for t in tecnicas if t]
+    comportamentais = [c for c in comportamentais if c]
+
+    return {
+        "analysis_id": analysis_id or uuid.uuid4().hex,
+        "created_at": created_at or datetime.now(timezone.utc),
+        "profissao": _normalize_label(prof.get('titulo')),
+        "nivel_confianca": _normalize_label(prof.get('nivel_confianca')),
+        "senioridade": _normalize_seniority(sen.get('nivel')),
+        "anos_experiencia": _coerce_years(sen.get('anos_experiencia')),
+        "proximo_cargo": _normalize_label(prox.get('cargo')),
+        "probabilidade_proximo": _normalize_label(prox.get('probabilidade')),
+        "lacunas_tecnicas": tecnicas,
+        "lacunas_comportamentais": comportamentais,
+        "n_lacunas": len(tecnicas) + len(comportamentais),
+    }
+
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def _try_lock(f, blocking: bool) -> bool:
+    if fcntl is not None:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            return True
+        except BlockingIOError:
+            return False
+    while True:
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            if not blocking:
+                return False
+            time.sleep(0.1)
+
+
+@contextmanager
+def _file_lock(path: str, blocking: bool = True):
+    # Lock exclusivo entre processos; devolve False se não for possível obtê-lo sem esperar
+    with open(path, 'a+b') as f:
+        if not _try_lock(f, blocking):
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class AnalyticsStore:
+
+    def __init__(self, path: str = None, flush_every: int = 1000, auto_compact_parts: int = 64,
+                 small_part_bytes: int = 8 * 1024 * 1024):
+        self.path = path or os.getenv('CVISION_ANALYTICS_DIR', os.path.join('data', 'analytics'))
+        self.flush_every = flush_every
+        self.auto_compact_parts = auto_compact_parts
+        self.small_part_bytes = small_part_bytes
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._compacting = False
+        self._aggregate_cache: Dict[Tuple, Any] = {}
+        os.makedirs(self.path, exist_ok=True)
+
+    # Escrita incremental: cada flush gera um novo arquivo Parquet no diretório
+    def append(self, analysis: Dict[str, Any], analysis_id: str = None) -> str:
+        row = flatten_analysis(analysis, analysis_id=analysis_id)
+        with self._lock:
+            self._buffer.append(row)
+            should_flush = len(self._buffer) >= self.flush_every
+        if should_flush:
+            self.flush()
+        return row["analysis_id"]
+
+    def extend(self, analyses: Iterable[Dict[str, Any]]) -> int:
+        count = 0
+        for analysis in analyses:
+            self.append(analysis)
+            count += 1
+        return count
+
+    def flush(self) -> Optional[str]:
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+        if not rows:
+            return None
+
+        table = pa.Table.from_pylist(rows, schema=SCHEMA)
+        timestamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+        final_path = os.path.join(self.path, f"part-{timestamp}-{uuid.uuid4().hex[:8]}.parquet")
+        tmp_path = final_path + ".tmp"
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, final_path)
+
+        logger.info(f"Analytics: {len(rows)} análises gravadas em {os.path.basename(final_path)}")
+
+        # Muitos arquivos pequenos degradam o scan; a compactação roda em segundo plano, fora da requisição
+        if self.auto_compact_parts and len(self._small_parts()) > self.auto_compact_parts:
+            self.compact_in_background()
+        return final_path
+
+    def compact_in_background(self) -> bool:
+        with self._lock:
+            if self._compacting:
+                return False
+            self._compacting = True
+
+        def run():
+            try:
+                self.compact(blocking=False)
+            except Exception as e:
+                logger.error(f"Analytics: erro na compactação: {e}")
+            finally:
+                with self._lock:
+                    self._compacting = False
+
+        threading.Thread(target=run, name="analytics-compact", daemon=True).start()
+        return True
+
+    def compact(self, target_rows: int = 250_000, blocking: bool = True) -> int:
+        # O lock em arquivo serializa a compactação entre sessões e processos que compartilham o diretório
+        with _file_lock(os.path.join(self.path, ".compact.lock"), blocking=blocking) as acquired:
+            if not acquired:
+                logger.info("Analytics: compactação já em andamento em outro processo")
+                return 0
+            # A lista é refeita dentro do lock: outro compactador pode ter acabado de substituir os arquivos
+            parts = self._small_parts()
+            if len(parts) <= 1:
+                return len(parts)
+            return self._compact_parts(parts, target_rows)
+
+    def _compact_parts(self, parts: List[str], target_rows: int) -> int:
+        dataset = ds.dataset(parts, format="parquet", schema=SCHEMA)
+        timestamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+        prefix = f"part-{timestamp}-{uuid.uuid4().hex[:8]}"
+        written = []
+        writer, rows_in_file = None, 0
+        try:
+            for batch in dataset.to_batches():
+                if writer is None:
+                    path = os.path.join(self.path, f"{prefix}-c{len(written):04d}.parquet")
+                    writer = pq.ParquetWriter(path + ".tmp", SCHEMA, compression="zstd")
+                    written.append(path)
+                writer.write_batch(batch, row_group_size=64_000)
+                rows_in_file += batch.num_rows
+                if rows_in_file >= target_rows:
+                    writer.close()
+                    writer, rows_in_file = None, 0
+        finally:
+            if writer is not None:
+                writer.close()
+
+        for path in written:
+            os.replace(path + ".tmp", path)
+        for path in parts:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+        logger.info(f"Analytics: {len(parts)} arquivos compactados em {len(written)}")
+        return len(written)
+
+    def _parts(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.path, "part-*.parquet")))
+
+    def _small_parts(self) -> List[str]:
+        # Arquivos já compactados (grandes) não são reescritos a cada compactação
+        small = []
+        for path in self._parts():
+            try:
+                if os.path.getsize(path) < self.small_part_bytes:
+                    small.append(path)
+            except FileNotFoundError:
+                continue
+        return small
+
+    def _read(self, read):
+        # Uma compactação concorrente pode remover arquivos listados; refaz a leitura com a lista nova
+        for attempt in range(3):
+            parts = self._parts()
+            try:
+                return read(parts)
+            except FileNotFoundError:
+                if attempt == 2:
+                    raise
+
+    def fingerprint(self) -> Tuple:
+        parts = []
+        for path in self._parts():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            parts.append((os.path.basename(path), stat.st_size, stat.st_mtime_ns))
+        return tuple(parts)
+
+    def _filter(self, senioridade: List[str] = None, min_anos: float = None,
+                max_anos: float = None, since: datetime = None) -> Optional[ds.Expression]:
+        expr = None
+        conditions = []
+        if senioridade:
+            conditions.append(ds.field("senioridade").isin(list(senioridade)))
+        if min_anos is not None:
+            conditions.append(ds.field("anos_experiencia") >= min_anos)
+        if max_anos is not None:
+            conditions.append(ds.field("anos_experiencia") <= max_anos)
+        if since is not None:
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            conditions.append(ds.field("created_at") >= pa.scalar(since, type=pa.timestamp("s", tz="UTC")))
+        for condition in conditions:
+            expr = condition if expr is None else expr & condition
+        return expr
+
+    def _scan(self, columns: List[str], **filters) -> pa.Table:
+        def read(parts):
+            if not parts:
+                return SCHEMA.empty_table().select(columns)
+            dataset = ds.dataset(parts, format="parquet", schema=SCHEMA)
+            return dataset.to_table(columns=columns, filter=self._filter(**filters))
+        return self._read(read)
+
+    def _cached(self, name: str, filters: Dict[str, Any], compute) -> Any:
+        key = (name, tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in filters.items())),
+               self.fingerprint())
+        with self._lock:
+            if key in self._aggregate_cache:
+                return self._aggregate_cache[key]
+        result = compute()
+        with self._lock:
+            # Descarta agregados de versões antigas do dataset
+            fingerprint = key[-1]
+            self._aggregate_cache = {k: v for k, v in self._aggregate_cache.items() if k[-1] == fingerprint}
+            self._aggregate_cache[key] = result
+        return result
+
+    @staticmethod
+    def _value_counts(array: pa.Array, column: str, top: int = None) -> pd.DataFrame:
+        array = array.drop_null() if hasattr(array, 'drop_null') else pc.drop_null(array)
+        if len(array) == 0:
+            return pd.DataFrame({column: pd.Series(dtype="string"), "total": pd.Series(dtype="int64")})
+        counts = pc.value_counts(array)
+        frame = pd.DataFrame({
+            column: counts.field("values").to_pandas(),
+            "total": counts.field("counts").to_pandas(),
+        }).sort_values("total", ascending=False, kind="stable")
+        if top is not None:
+            frame = frame.head(top)
+        return frame.reset_index(drop=True)
+
+    def count(self, **filters) -> int:
+        def read(parts):
+            if not parts:
+                return 0
+            dataset = ds.dataset(parts, format="parquet", schema=SCHEMA)
+            return dataset.count_rows(filter=self._filter(**filters))
+        return self._cached("count", filters, lambda: self._read(read))
+
+    def seniority_distribution(self, **filters) -> pd.DataFrame:
+        def compute():
+            table = self._scan(["senioridade"], **filters)
+            frame = self._value_counts(table.column("senioridade").combine_chunks(), "senioridade")
+            order = {nivel: i for i, nivel in enumerate(NIVEIS_SENIORIDADE)}
+            frame["_ordem"] = frame["senioridade"].map(lambda n: order.get(n, len(order)))
+            return frame.sort_values(["_ordem", "total"], ascending=[True, False]).drop(columns="_ordem").reset_index(drop=True)
+        return self._cached("seniority_distribution", filters, compute)
+
+    def top_technical_gaps(self, top: int = 15, **filters) -> pd.DataFrame:
+        def compute():
+            table = self._scan(["lacunas_tecnicas"], **filters)
+            flat = pc.list_flatten(table.column("lacunas_tecnicas").combine_chunks())
+            return self._value_counts(pc.utf8_lower(flat), "skill", top=top)
+        return self._cached(f"top_technical_gaps:{top}", filters, compute)
+
+    def top_next_roles(self, top: int = 15, **filters) -> pd.DataFrame:
+        def compute():
+            table = self._scan(["proximo_cargo"], **filters)
+            return self._value_counts(table.column("proximo_cargo").combine_chunks(), "cargo", top=top)
+        return self._cached(f"top_next_roles:{top}", filters, compute)
+
+    def experience_summary(self, **filters) -> Dict[str, Optional[float]]:
+        def compute():
+            table = self._scan(["anos_experiencia"], **filters)
+            anos = table.column("anos_experiencia")
+            if anos.null_count == len(anos):
+                return {"media": None, "mediana": None, "p90": None}
+            quantiles = pc.quantile(anos, q=[0.5, 0.9])
+            return {
+                "media": round(pc.mean(anos).as_py(), 1),
+                "mediana": round(quantiles[0].as_py(), 1),
+                "p90": round(quantiles[1].as_py(), 1),
+            }
+        return self._cached("experience_summary", filters, compute)
+
+
+def import_json_files(store: AnalyticsStore, paths: Iterable[str]) -> int:
+    total = 0
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Erro ao ler {path}: {e}")
+            continue
+        analyses = data if isinstance(data, list) else [data]
+        total += store.extend(a for a in analyses if isinstance(a, dict))
+    store.flush()
+    return total
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Importa análises JSON para o armazenamento analítico")
+    parser.add_argument("arquivos", nargs="+", help="Arquivos JSON (ex: analise_carreira.json)")
+    parser.add_argument("--dir", default=None, help="Diretório do dataset Parquet")
+    parser.add_argument("--compact", action="store_true", help="Compacta os arquivos após a importação")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    store = AnalyticsStore(args.dir)
+    imported = import_json_files(store, args.arquivos)
+    if args.compact:
+        store.compact()
+    print(f"✅ {imported} análises importadas em {store.path}")
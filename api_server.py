@@ -0,0 +1,355 @@
+import os
+import json
+import time
+import threading
+import logging
+from collections import deque, Counter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Callable, Tuple
+
+from career_agent import CareerIntelligenceAgent, GeminiAPIError, MAX_DOCUMENT_CHARS
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 2 * 1024 * 1024
+
+
+class HTTPError(Exception):
+
+    def __init__(self, status: int, message: str, retry_after: int = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.retry_after = retry_after
+
+
+class ServiceMetrics:
+
+    def __init__(self, window_size: int = 1000):
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._statuses = Counter()
+        self._endpoints = Counter()
+        self._latencies: Dict[str, deque] = {}
+        self._window_size = window_size
+
+    def record(self, endpoint: str, status: int, latency: float):
+        with self._lock:
+            self._statuses[status] += 1
+            self._endpoints[endpoint] += 1
+            if endpoint not in self._latencies:
+                self._latencies[endpoint] = deque(maxlen=self._window_size)
+            if status == 200:
+                self._latencies[endpoint].append(latency)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = {}
+            for endpoint, samples in self._latencies.items():
+                ordered = sorted(samples)
+                if ordered:
+                    latencies[endpoint] = {
+                        "p50": round(ordered[len(ordered) // 2], 3),
+                        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+                        "amostras": len(ordered)
+                    }
+            return {
+                "uptime_seconds": round(time.time() - self.started_at, 1),
+                "requisicoes_por_endpoint": dict(self._endpoints),
+                "requisicoes_por_status": {str(k): v for k, v in self._statuses.items()},
+                "latencia_segundos": latencies
+            }
+
+    def mean_latency(self) -> float:
+        with self._lock:
+            samples = [s for d in self._latencies.values() for s in d]
+        return sum(samples) / len(samples) if samples else 0.0
+
+
+class WorkerPool:
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api-worker")
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self.running = 0
+        self.queued = 0
+        self.shed = 0
+        self.expired = 0
+
+    def submit(self, fn: Callable[[], Any], deadline: float, mean_latency: float) -> Any:
+        # Fila cheia: rejeita imediatamente em vez de acumular trabalho
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.shed += 1
+            raise HTTPError(429, "Servidor saturado. Tente novamente em instantes.", retry_after=5)
+
+        with self._lock:
+            expected_wait = (self.queued / self.workers) * mean_latency if self.running >= self.workers else 0.0
+        if mean_latency and time.monotonic() + expected_wait + mean_latency > deadline:
+            self._slots.release()
+            with self._lock:
+                self.shed += 1
+            raise HTTPError(503, "Prazo da requisição não pode ser cumprido com a fila atual.", retry_after=10)
+
+        with self._lock:
+            self.queued += 1
+
+        def run():
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+            try:
+                # Requisição que expirou na fila não chega a chamar o Gemini
+                if time.monotonic() > deadline:
+                    with self._lock:
+                        self.expired += 1
+                    raise HTTPError(504, "Prazo da requisição expirou na fila.")
+                return fn()
+            finally:
+                with self._lock:
+                    self.running -= 1
+                self._slots.release()
+
+        future = self._executor.submit(run)
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeout:
+            future.cancel()
+            with self._lock:
+                self.expired += 1
+            raise HTTPError(504, "Prazo da requisição excedido.")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"workers": self.workers, "capacidade_fila": self.queue_size, "em_execucao": self.running,
+                    "na_fila": self.queued, "rejeitadas": self.shed, "expiradas": self.expired}
+
+
+class CareerService:
+
+    def __init__(self, agent: CareerIntelligenceAgent = None, workers: int = None, queue_size: int = None,
+                 default_deadline: float = None):
+        self.agent = agent or CareerIntelligenceAgent()
+        self.pool = WorkerPool(
+            workers or int(os.getenv('CVISION_API_WORKERS', '8')),
+            queue_size if queue_size is not None else int(os.getenv('CVISION_API_QUEUE', '32'))
+        )
+        self.default_deadline = default_deadline or float(os.getenv('CVISION_API_DEADLINE', '150'))
+        self.metrics = ServiceMetrics()
+        self.routes: Dict[Tuple[str, str], Callable] = {
+            ("POST", "/v1/analyze"): self.analyze,
+            ("POST", "/v1/roadmap"): self.roadmap,
+            ("POST", "/v1/roadmaps"): self.roadmaps,
+            ("POST", "/v1/report"): self.report,
+            ("POST", "/v1/rank"): self.rank,
+            ("POST", "/v1/candidates"): self.add_candidate,
+            ("POST", "/v1/chat"): self.chat,
+            ("GET", "/healthz"): self.health,
+            ("GET", "/metrics"): self.metrics_view,
+        }
+
+    @staticmethod
+    def _require_text(body: Dict[str, Any], field: str, max_size: int = MAX_DOCUMENT_CHARS) -> str:
+        value = body.get(field)
+        if not isinstance(value, str) or not value.strip():
+            raise HTTPError(400, f"Campo '{field}' é obrigatório.")
+        if len(value) > max_size:
+            raise HTTPError(413, f"Campo '{field}' excede {max_size} caracteres.")
+        return value
+
+    def analyze(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        resume_text = self._require_text(body, "resume_text")
+        user_id = body.get("user_id")
+        if user_id is not None and (not isinstance(user_id, str) or len(user_id) > 200):
+            raise HTTPError(400, "Campo 'user_id' deve ser texto de até 200 caracteres.")
+        return {"analysis": self.agent.analyze_resume(resume_text, chunked=body.get("chunked"),
+                                                      sectioned=body.get("sectioned"), user_id=user_id)}
+
+    def roadmap(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        resume_text = self._require_text(body, "resume_text")
+        career_goal = self._require_text(body, "career_goal", max_size=300)
+        return {"roadmap": self.agent.generate_career_roadmap(resume_text, career_goal)}
+
+    def roadmaps(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        resume_text = self._require_text(body, "resume_text")
+        goals = body.get("career_goals")
+        if not isinstance(goals, list) or not all(isinstance(g, str) and len(g) <= 300 for g in goals):
+            raise HTTPError(400, "Campo 'career_goals' deve ser uma lista de textos.")
+        return self.agent.compare_career_roadmaps(resume_text, goals)
+
+    def report(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        analysis = body.get("analysis")
+        if analysis is None:
+            analysis = self.agent.analyze_resume(self._require_text(body, "resume_text"))
+        elif not isinstance(analysis, dict):
+            raise HTTPError(400, "Campo 'analysis' deve ser um objeto.")
+        return {"analysis": analysis, "report": self.agent.generate_report(analysis)}
+
+    def _ranking_index(self):
+        from resume_ranker import get_default_ranking_index
+        index = get_default_ranking_index()
+        if index is None:
+            raise HTTPError(503, "Índice de ranqueamento não configurado (CVISION_RANKING_INDEX).")
+        return index
+
+    def rank(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        job_description = self._require_text(body, "job_description", max_size=20000)
+        top_k = body.get("top_k", 10)
+        if not isinstance(top_k, int) or not 1 <= top_k <= 100:
+            raise HTTPError(400, "Campo 'top_k' deve ser um inteiro entre 1 e 100.")
+        return {"candidatos": self.agent.rank_candidates(job_description, index=self._ranking_index(), top_k=top_k,
+                                                         assess=body.get("assess", True) is not False)}
+
+    def add_candidate(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        candidate_id = self._require_text(body, "id", max_size=200)
+        resume_text = self._require_text(body, "resume_text")
+        index = self._ranking_index()
+        return {"id": candidate_id, "atualizado": index.add(candidate_id, resume_text), "total": len(index)}
+
+    def chat(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        message = self._require_text(body, "message", max_size=10000)
+        context = body.get("context") or ""
+        if not isinstance(context, str):
+            raise HTTPError(400, "Campo 'context' deve ser texto.")
+        return {"resposta": self.agent.chat(message, context[:20000])}
+
+    def health(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        pool = self.pool.snapshot()
+        saturated = pool["na_fila"] >= pool["capacidade_fila"]
+        if saturated:
+            raise HTTPError(503, "Fila de trabalho cheia.")
+        return {"status": "ok", **pool}
+
+    def metrics_view(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        metrics = self.metrics.snapshot()
+        metrics["pool"] = self.pool.snapshot()
+        metrics["modelos"] = self.agent.router.stats()
+        metrics["orcamento_saida"] = self.agent.budgeter.stats()
+        if self.agent.hedger is not None:
+            metrics["hedge"] = self.agent.hedger.counters()
+        if self.agent.quota is not None:
+            metrics["cota"] = self.agent.quota.status()
+        if self.agent.transport is not None:
+            metrics["transporte"] = self.agent.transport.stats()
+        return metrics
+
+    def handle(self, method: str, path: str, body: Dict[str, Any], deadline_seconds: float = None) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        start = time.monotonic()
+        handler = self.routes.get((method, path))
+        status, headers = 200, {}
+        try:
+            if handler is None:
+                raise HTTPError(404 if not any(p == path for _, p in self.routes) else 405, "Rota não encontrada.")
+            if method == "GET":
+                payload = handler(body)
+            else:
+                deadline = start + min(deadline_seconds or self.default_deadline, self.default_deadline)
+                payload = self.pool.submit(lambda: handler(body), deadline, self.metrics.mean_latency())
+        except HTTPError as e:
+            status, payload = e.status, {"erro": e.message}
+            if e.retry_after:
+                headers["Retry-After"] = str(e.retry_after)
+        except GeminiAPIError as e:
+            status = 503 if e.status_code == 429 else 502
+            payload = {"erro": str(e)}
+            if status == 503:
+                headers["Retry-After"] = "60"
+        except ValueError as e:
+            status, payload = 422, {"erro": str(e)}
+        except Exception as e:
+            logger.error(f"Erro interno em {path}: {type(e).__name__} - {e}", exc_info=True)
+            status, payload = 500, {"erro": "Erro interno."}
+
+        if method == "POST":
+            self.metrics.record(path, status, time.monotonic() - start)
+        return status, payload, headers
+
+
+def make_handler(service: CareerService):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, payload: Dict[str, Any], headers: Dict[str, str] = None):
+            data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _dispatch(self, method: str):
+            body = {}
+            if method == "POST":
+                length = int(self.headers.get("Content-Length") or 0)
+                if length > MAX_BODY_BYTES:
+                    self._send(413, {"erro": "Corpo da requisição muito grande."})
+                    self.close_connection = True
+                    return
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    self._send(400, {"erro": "JSON inválido."})
+                    return
+                if not isinstance(body, dict):
+                    self._send(400, {"erro": "JSON deve ser um objeto."})
+                    return
+
+            deadline = None
+            if self.headers.get("X-Request-Deadline"):
+                try:
+                    deadline = float(self.headers["X-Request-Deadline"])
+                except ValueError:
+                    self._send(400, {"erro": "X-Request-Deadline deve ser um número de segundos."})
+                    return
+
+            status, payload, headers = service.handle(method, self.path.split("?")[0], body, deadline)
+            self._send(status, payload, headers)
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def log_message(self, format, *args):
+            logger.debug("%s - %s", self.address_string(), format % args)
+
+    return Handler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8080, service: CareerService = None):
+    service = service or CareerService()
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    pool = service.pool.snapshot()
+    logger.info(f"CVision API em http://{host}:{port} ({pool['workers']} workers, fila {pool['capacidade_fila']})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serviço HTTP do CVision AI")
+    parser.add_argument("--host", default=os.getenv('CVISION_API_HOST', '127.0.0.1'))
+    parser.add_argument("--port", type=int, default=int(os.getenv('CVISION_API_PORT', '8080')))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--queue", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if os.path.exists('.env'):
+        from dotenv import load_dotenv
+        load_dotenv()
+    serve(args.host, args.port, CareerService(workers=args.workers, queue_size=args.queue))
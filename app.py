@@ -1,17 +1,27 @@
 import streamlit as st
 import os
-from dotenv import load_dotenv
-from career_agent import CareerIntelligenceAgent
-import PyPDF2
+from career_agent import CareerIntelligenceAgent, MAX_COMPARE_GOALS
+from career_models import Analysis, Roadmap, Profession, Seniority, Gaps, NextRole, GrowthPlan
+from hedging import get_default_hedger
+from quota import get_default_quota
+import re
 import json
+import uuid
 import logging
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
 from pathlib import Path
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
-load_dotenv()
+
+# PyPDF2, plotly e python-dotenv são importados apenas no primeiro uso
+@st.cache_resource
+def load_environment():
+    if Path('.env').exists():
+        from dotenv import load_dotenv
+        load_dotenv()
+
+load_environment()
 
 st.set_page_config(
     page_title="CVision AI | Análise de Currículos",
@@ -20,14 +30,15 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-if "analysis_data" not in st.session_state:
-    st.session_state.analysis_data = None
-if "curriculo_text" not in st.session_state:
-    st.session_state.curriculo_text = None
-if "career_goal" not in st.session_state:
-    st.session_state.career_goal = None
-if "roadmap" not in st.session_state:
-    st.session_state.roadmap = None
+if "user_id" not in st.session_state:
+    # O id da sessão fica só no servidor e também identifica o usuário na reanálise incremental.
+    # Restaurar pela URL é opcional: quem tiver o link acessa o currículo e a análise da sessão
+    st.session_state.user_id = uuid.uuid4().hex
+    if os.getenv('CVISION_SESSION_IN_URL', '').lower() in ('1', 'true', 'yes'):
+        sessao = st.query_params.get("sessao", "")
+        if re.fullmatch(r'[0-9a-f]{32}', sessao):
+            st.session_state.user_id = sessao
+        st.query_params["sessao"] = st.session_state.user_id
 
 # CSS
 st.markdown("""
@@ -85,9 +96,11 @@ def create_skills_radar(lacunas_tecnicas):
     if not lacunas_tecnicas:
         return None
     
-    skills = [l.get('skill', 'N/A') for l in lacunas_tecnicas[:8]]
+    import plotly.graph_objects as go
+    
+    skills = [l.skill or 'N/A' for l in lacunas_tecnicas[:8]]
     importance_map = {'alta': 3, 'média': 2, 'baixa': 1}
-    values = [importance_map.get(l.get('importancia', 'média'), 2) for l in lacunas_tecnicas[:8]]
+    values = [importance_map[l.importancia] for l in lacunas_tecnicas[:8]]
     
     fig = go.Figure()
     fig.add_trace(go.Scatterpolar(
@@ -114,6 +127,8 @@ def create_skills_radar(lacunas_tecnicas):
     return fig
 
 def create_senioridade_bar(nivel, anos):
+    import plotly.graph_objects as go
+    
     niveis = ['Júnior', 'Pleno', 'Sênior', 'Especialista']
     if nivel not in niveis:
         nivel_idx = 1
@@ -144,153 +159,69 @@ def create_senioridade_bar(nivel, anos):
     
     return fig
 
+@st.cache_resource
+def get_analytics_store():
+    if not os.getenv('CVISION_ANALYTICS_DIR'):
+        return None
+    from analytics_store import AnalyticsStore
+    return AnalyticsStore(flush_every=1)
+
+def record_analysis(analysis):
+    store = get_analytics_store()
+    if store is None:
+        return
+    try:
+        store.append(analysis)
+    except Exception as e:
+        logger.error(f"Erro ao gravar análise no analytics: {e}")
+
+@st.cache_resource
+def get_session_store():
+    from session_store import get_default_session_store
+    return get_default_session_store()
+
+# O session_state guarda só o id da sessão; currículo, análise e roadmaps ficam no store compartilhado
+def session_load(name, model=None):
+    value = get_session_store().load(st.session_state.user_id, name)
+    if value is not None and model is not None:
+        return model.from_dict(value)
+    return value
+
+def session_save(name, value):
+    if hasattr(value, 'to_dict'):
+        value = value.to_dict()
+    get_session_store().save(st.session_state.user_id, name, value)
+
+def load_comparison():
+    results = session_load("comparacao")
+    if results is None:
+        return None
+    return {goal: value if isinstance(value, str) else Roadmap.from_dict(value) for goal, value in results.items()}
+
+def save_comparison(results):
+    session_save("comparacao", None if results is None else
+                 {goal: value if isinstance(value, str) else value.to_dict() for goal, value in results.items()})
+
+def read_uploaded_resume(uploaded_file):
+    if uploaded_file.type == "application/pdf":
+        import PyPDF2
+        pdf_reader = PyPDF2.PdfReader(uploaded_file)
+        resume_text = ""
+        for page in pdf_reader.pages:
+            text = page.extract_text()
+            if text:
+                resume_text += text + "\n"
+        return resume_text
+    return uploaded_file.read().decode('utf-8')
+
 def generate_career_roadmap(curriculo, career_goal, api_key):
     try:
         agent = CareerIntelligenceAgent(api_key=api_key)
-        logger.info(f"Gerando roadmap para objetivo: {career_goal}")
-        
-        prompt = f"""Você é um consultor executivo de carreira altamente experiente, especializado em transições profissionais estratégicas e desenvolvimento de liderança.
-
-ANÁLISE SOLICITADA:
-Avalie a viabilidade de transição do perfil profissional abaixo para o objetivo de carreira definido. Crie um roadmap estratégico, realista e acionável.
-
-CURRÍCULO DO PROFISSIONAL:
-{curriculo[:3000]}
-
-OBJETIVO DE CARREIRA DESEJADO: {career_goal}
-
-DIRETRIZES PARA ANÁLISE PROFISSIONAL:
-1. Seja honesto sobre a viabilidade do objetivo considerando o perfil atual
-2. Defina prazos realistas baseados em transições de mercado
-3. Priorize ações de alto impacto que acelerem a transição
-4. Sugira certificações e cursos reconhecidos pelo mercado
-5. Inclua desenvolvimento de soft skills críticas para o cargo alvo
-6. Considere networking estratégico e visibilidade profissional
-7. Identifique possíveis cargos intermediários se necessário
-
-Retorne APENAS JSON válido (sem markdown, sem comentários):
-{{
-    "objetivo_viavel": true,
-    "prazo_estimado": "18-24 meses",
-    "nivel_desafio": "médio",
-    "etapas": [
-        {{
-            "ordem": 1,
-            "titulo": "Fundação Técnica e Posicionamento",
-            "prazo": "4-6 meses",
-            "acoes": [
-                "Completar certificação X reconhecida no mercado",
-                "Desenvolver projeto demonstrativo em Y",
-                "Iniciar networking estratégico com profissionais da área"
-            ],
-            "skills_desenvolver": [
-                "Skill técnica específica 1",
-                "Skill técnica específica 2", 
-                "Soft skill relevante"
-            ],
-            "recursos": [
-                "Certificação profissional reconhecida (ex: AWS, Azure, PMP)",
-                "Curso estruturado de plataforma respeitada",
-                "Comunidade ou grupo profissional específico"
-            ],
-            "indicadores_sucesso": [
-                "Certificação obtida",
-                "Portfolio com 3+ projetos relevantes",
-                "Rede de 50+ conexões estratégicas"
-            ]
-        }}
-    ],
-    "cargos_intermediarios": ["Cargo de transição 1", "Cargo de transição 2"],
-    "investimento_estimado": "R$ X.XXX - investimento em cursos, certificações e networking",
-    "probabilidade_sucesso": "alta",
-    "fatores_criticos": [
-        "Dedicação de X horas semanais para desenvolvimento",
-        "Investimento em certificações chave",
-        "Networking ativo e consistente"
-    ],
-    "observacoes": "Análise estratégica considerando tendências de mercado, demanda por perfil e competitividade. Inclua insights sobre o momento ideal para transição e possíveis desafios."
-}}"""
-
-        payload = {
-            "contents": [{"parts": [{"text": prompt}]}],
-            "generationConfig": {
-                "temperature": 0.7,
-                "maxOutputTokens": 8192
-            }
-        }
-        
-        headers = {"Content-Type": "application/json"}
-        import requests
-        
-        logger.info("Fazendo requisição para API do Gemini...")
-        response = requests.post(
-            f"{agent.api_url}?key={api_key}",
-            headers=headers,
-            json=payload,
-            timeout=120
-        )
-        
-        if response.status_code == 429:
-            logger.warning("Rate limit atingido, tentando modelos alternativos...")
-            fallback_models = ["gemini-1.5-flash-latest", "gemini-pro"]
-            for model in fallback_models:
-                try:
-                    fallback_url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
-                    logger.info(f"Tentando modelo: {model}")
-                    response = requests.post(
-                        f"{fallback_url}?key={api_key}",
-                        headers=headers,
-                        json=payload,
-                        timeout=120
-                    )
-                    if response.status_code == 200:
-                        logger.info(f"Sucesso com modelo: {model}")
-                        break
-                except Exception as fallback_error:
-                    logger.error(f"Erro no modelo {model}: {fallback_error}")
-                    continue
-        
-        if response.status_code == 200:
-            result = response.json()
-            logger.info("Resposta recebida com sucesso")
-            
-            text = result['candidates'][0]['content']['parts'][0]['text']
-            logger.info(f"Texto recebido (primeiros 200 chars): {text[:200]}")
-            
-            # Limpar markdown de forma mais robusta
-            text = text.strip()
-            
-            # Remover blocos de código markdown
-            if '```json' in text:
-                # Extrair apenas o conteúdo entre ```json e ```
-                start_idx = text.find('```json') + 7
-                end_idx = text.rfind('```')
-                if start_idx > 6 and end_idx > start_idx:
-                    text = text[start_idx:end_idx].strip()
-            elif text.startswith('```'):
-                # Fallback para ``` genérico
-                lines = text.split('\n')
-                if len(lines) > 2:
-                    text = '\n'.join(lines[1:-1])
-                text = text.replace('```', '').strip()
-            
-            try:
-                roadmap_data = json.loads(text)
-                logger.info("JSON parseado com sucesso")
-                return roadmap_data
-            except json.JSONDecodeError as json_error:
-                logger.error(f"Erro ao decodificar JSON do roadmap: {json_error}")
-                logger.error(f"Texto completo que causou erro: {text}")
-                st.error(f"❌ Erro ao processar resposta da API. A resposta pode ter sido truncada. Tente um objetivo mais simples ou específico.")
-                return None
-        else:
-            error_msg = f"Erro na API ao gerar roadmap: {response.status_code}"
-            if response.text:
-                error_msg += f" - {response.text[:200]}"
-            logger.error(error_msg)
-            st.error(f"❌ Erro na API: Status {response.status_code}")
-            return None
-            
+        return Roadmap.from_dict(agent.generate_career_roadmap(curriculo, career_goal))
+    except ValueError as e:
+        logger.error(f"Erro ao gerar roadmap: {e}")
+        st.error(f"❌ {str(e)}")
+        return None
     except Exception as e:
         logger.error(f"Erro ao gerar roadmap: {type(e).__name__} - {str(e)}")
         import traceback
@@ -298,6 +229,93 @@ Retorne APENAS JSON válido (sem markdown, sem comentários):
         st.error(f"❌ Erro: {str(e)}")
         return None
 
+def comparison_rows(goals, results):
+    prob_percent = {'alta': '75-90%', 'média': '50-70%', 'baixa': '20-40%'}
+    rows = []
+    for goal in goals:
+        result = results.get(goal)
+        if result is None:
+            rows.append({"Objetivo": goal, "Status": "⏳ Gerando..."})
+        elif isinstance(result, str):
+            rows.append({"Objetivo": goal, "Status": f"❌ {result}"})
+        else:
+            rows.append({
+                "Objetivo": goal,
+                "Status": "✅",
+                "Viabilidade": "✓ Viável" if result.objetivo_viavel else "⚠ Desafiador",
+                "Prazo": result.prazo_estimado or "N/A",
+                "Sucesso": f"{result.probabilidade_sucesso} ({prob_percent[result.probabilidade_sucesso]})",
+                "Desafio": result.nivel_desafio,
+                "Etapas": len(result.etapas),
+                "Investimento": result.investimento_estimado or "N/A",
+            })
+    return rows
+
+def render_roadmap_details(roadmap):
+    # Cargos intermediários se existirem
+    cargos_inter = roadmap.cargos_intermediarios
+    if cargos_inter:
+        st.markdown("#### 🎯 Cargos Intermediários Recomendados")
+        st.markdown("Para facilitar a transição, considere estas posições estratégicas:")
+        for i, cargo in enumerate(cargos_inter, 1):
+            st.markdown(f"{i}. **{cargo}**")
+        st.markdown("---")
+
+    st.markdown("### 🗺️ Roadmap Estratégico de Desenvolvimento")
+
+    etapas = roadmap.etapas
+    if not etapas:
+        st.warning("⚠️ Nenhuma etapa foi gerada no roadmap")
+    else:
+        for etapa in etapas:
+            ordem = etapa.ordem or '?'
+            titulo = etapa.titulo or 'Etapa sem título'
+            prazo = etapa.prazo or 'Prazo não definido'
+
+            with st.expander(f"**Etapa {ordem}:** {titulo} ({prazo})", expanded=(ordem == 1)):
+                acoes = etapa.acoes
+                if acoes:
+                    st.markdown("**🎯 Ações Estratégicas:**")
+                    for acao in acoes:
+                        st.markdown(f"• {acao}")
+                    st.markdown("")
+
+                skills = etapa.skills_desenvolver
+                if skills:
+                    st.markdown("**💡 Skills a Desenvolver:**")
+                    cols = st.columns(min(len(skills), 3))
+                    for i, skill in enumerate(skills):
+                        with cols[i % len(cols)]:
+                            st.markdown(f"`{skill}`")
+                    st.markdown("")
+
+                recursos = etapa.recursos
+                if recursos:
+                    st.markdown("**📚 Recursos Recomendados:**")
+                    for recurso in recursos:
+                        st.markdown(f"• {recurso}")
+                    st.markdown("")
+
+                indicadores = etapa.indicadores_sucesso
+                if indicadores:
+                    st.markdown("**✅ Indicadores de Sucesso:**")
+                    for indicador in indicadores:
+                        st.markdown(f"☑️ {indicador}")
+
+    # Fatores críticos
+    fatores = roadmap.fatores_criticos
+    if fatores:
+        st.markdown("---")
+        st.markdown("### ⚡ Fatores Críticos de Sucesso")
+        for fator in fatores:
+            st.warning(f"🔑 {fator}")
+
+    # Observações estratégicas
+    if roadmap.observacoes:
+        st.markdown("---")
+        st.markdown("### 💼 Análise Estratégica")
+        st.info(roadmap.observacoes)
+
 st.markdown("""
 <div style='text-align: center; padding: 30px 0; border-bottom: 1px solid #30363d;'>
     <h1 style='font-size: 42px; margin: 0; color: #58a6ff; letter-spacing: 2px;'>CVision AI</h1>
@@ -324,6 +342,23 @@ with st.sidebar:
             except Exception as e:
                 st.error(f"❌ Erro: {str(e)[:50]}")
     
+    hedger = get_default_hedger()
+    if hedger is not None:
+        counters = hedger.counters()
+        st.caption(f"Hedge: {counters['hedges']} de {counters['requisicoes']} requisições "
+                   f"({counters['taxa_hedge']:.1%}), {counters['hedges_vencedores']} venceram")
+    
+    quota = get_default_quota()
+    if quota is not None:
+        cota = quota.status()
+        for modelo, bucket in cota["buckets"].items():
+            st.caption(f"Cota {modelo}: {bucket['requisicoes_restantes']}/{cota['limite_rpm']} req/min, "
+                       f"{bucket['tokens_restantes']:,} tokens, {bucket['na_fila']} na fila")
+    
+    store = get_session_store().stats()
+    st.caption(f"Sessões: {store['payloads']} payloads, {store['bytes'] / 1024 / 1024:.1f} de "
+               f"{store['limite_bytes'] / 1024 / 1024:.0f} MB")
+    
     # Marca d'água no final da sidebar
     st.markdown("""
     <div style='position: fixed; bottom: 20px; left: 20px; width: 240px; opacity: 0.4; transition: opacity 0.3s;'>
@@ -335,7 +370,12 @@ with st.sidebar:
     </div>
     """, unsafe_allow_html=True)
 
-if st.session_state.analysis_data is None:
+# Currículo e análise formam uma unidade: se o LRU despejou qualquer um deles, a sessão recomeça do upload
+if not get_session_store().touch(st.session_state.user_id, ("curriculo", "analise")):
+    get_session_store().clear(st.session_state.user_id)
+analysis = session_load("analise", Analysis)
+
+if analysis is None:
     
     # Feature cards antes do upload
     st.markdown("<br>", unsafe_allow_html=True)
@@ -397,18 +437,13 @@ if st.session_state.analysis_data is None:
             try:
                 if uploaded_file.type == "application/pdf":
                     with st.spinner("📄 Processando PDF..."):
-                        pdf_reader = PyPDF2.PdfReader(uploaded_file)
-                        resume_text = ""
-                        for page in pdf_reader.pages:
-                            text = page.extract_text()
-                            if text:
-                                resume_text += text + "\n"
+                        resume_text = read_uploaded_resume(uploaded_file)
                         
                         if not resume_text.strip():
                             st.error("❌ Não foi possível extrair texto do PDF")
                             st.stop()
                 else:
-                    resume_text = uploaded_file.read().decode('utf-8')
+                    resume_text = read_uploaded_resume(uploaded_file)
                 
                 if resume_text and len(resume_text.strip()) > 50:
                     api_key = os.getenv('GOOGLE_API_KEY')
@@ -420,10 +455,15 @@ if st.session_state.analysis_data is None:
                     with st.spinner("🔍 Analisando seu currículo..."):
                         try:
                             agent = CareerIntelligenceAgent(api_key=api_key)
-                            analysis = agent.analyze_resume(resume_text)
+                            analysis = agent.analyze_resume(resume_text, user_id=st.session_state.user_id)
                             
-                            st.session_state.analysis_data = analysis
-                            st.session_state.curriculo_text = resume_text
+                            session_save("curriculo", resume_text)
+                            session_save("analise", analysis)
+                            session_save("objetivo", None)
+                            session_save("roadmap", None)
+                            session_save("objetivos", None)
+                            save_comparison(None)
+                            record_analysis(analysis)
                             st.success("✅ Análise concluída!")
                             st.rerun()
                             
@@ -438,12 +478,11 @@ if st.session_state.analysis_data is None:
                 logger.error(f"Erro: {e}", exc_info=True)
 
 else:
-    analysis = st.session_state.analysis_data
-    prof = analysis.get('profissao_real', {})
-    sen = analysis.get('nivel_senioridade', {})
-    lac = analysis.get('lacunas', {})
-    prox = analysis.get('proximo_cargo', {})
-    plano = analysis.get('plano_crescimento', {})
+    prof = analysis.profissao_real or Profession()
+    sen = analysis.nivel_senioridade or Seniority()
+    lac = analysis.lacunas or Gaps()
+    prox = analysis.proximo_cargo or NextRole()
+    plano = analysis.plano_crescimento or GrowthPlan()
     
     st.markdown("## 📊 Dashboard de Análise")
     
@@ -453,8 +492,8 @@ else:
         st.markdown(f"""
         <div class='metric-card'>
             <div class='stat-label'>Profissão Identificada</div>
-            <div class='stat-value' style='font-size: 24px;'>{prof.get('titulo', 'N/A')}</div>
-            <div style='color: #8b92a7; margin-top: 8px;'>Confiança: {prof.get('nivel_confianca', 'N/A')}</div>
+            <div class='stat-value' style='font-size: 24px;'>{prof.titulo or 'N/A'}</div>
+            <div style='color: #8b92a7; margin-top: 8px;'>Confiança: {prof.nivel_confianca or 'N/A'}</div>
         </div>
         """, unsafe_allow_html=True)
     
@@ -462,13 +501,13 @@ else:
         st.markdown(f"""
         <div class='metric-card'>
             <div class='stat-label'>Senioridade</div>
-            <div class='stat-value'>{sen.get('nivel', 'N/A')}</div>
-            <div style='color: #8b92a7; margin-top: 8px;'>{sen.get('anos_experiencia', 0)} anos</div>
+            <div class='stat-value'>{sen.nivel or 'N/A'}</div>
+            <div style='color: #8b92a7; margin-top: 8px;'>{sen.anos_experiencia or 0} anos</div>
         </div>
         """, unsafe_allow_html=True)
     
     with col3:
-        lacunas_count = len(lac.get('tecnicas', [])) + len(lac.get('comportamentais', []))
+        lacunas_count = len(lac)
         st.markdown(f"""
         <div class='metric-card'>
             <div class='stat-label'>Áreas de Melhoria</div>
@@ -481,8 +520,8 @@ else:
         st.markdown(f"""
         <div class='metric-card'>
             <div class='stat-label'>Projeção Natural</div>
-            <div class='stat-value' style='font-size: 20px;'>{prox.get('cargo', 'N/A')}</div>
-            <div style='color: #8b92a7; margin-top: 8px;'>Em {prox.get('prazo_estimado', 'N/A')}</div>
+            <div class='stat-value' style='font-size: 20px;'>{prox.cargo or 'N/A'}</div>
+            <div style='color: #8b92a7; margin-top: 8px;'>Em {prox.prazo_estimado or 'N/A'}</div>
         </div>
         """, unsafe_allow_html=True)
     
@@ -491,23 +530,109 @@ else:
     col_graph1, col_graph2 = st.columns(2)
     
     with col_graph1:
-        lacunas_tec = lac.get('tecnicas', [])
+        lacunas_tec = lac.tecnicas
         if lacunas_tec:
             fig_skills = create_skills_radar(lacunas_tec)
             if fig_skills:
                 st.plotly_chart(fig_skills, use_container_width=True)
     
     with col_graph2:
-        nivel = sen.get('nivel', 'Pleno')
-        anos = sen.get('anos_experiencia', 0)
+        nivel = sen.nivel or 'Pleno'
+        anos = sen.anos_experiencia or 0
         fig_sen = create_senioridade_bar(nivel, anos)
         if fig_sen:
             st.plotly_chart(fig_sen, use_container_width=True)
     
+    with st.expander("🔁 Regenerar uma seção da análise"):
+        secoes = {
+            "perfil": "Profissão e senioridade",
+            "lacunas": "Lacunas",
+            "proximo_cargo": "Próximo cargo",
+            "plano_crescimento": "Plano de crescimento"
+        }
+        secao = st.selectbox("Seção", list(secoes), format_func=secoes.get, label_visibility="collapsed")
+        if st.button("Regenerar seção", width="stretch"):
+            with st.spinner("🔍 Regenerando seção..."):
+                try:
+                    agent = CareerIntelligenceAgent(api_key=os.getenv('GOOGLE_API_KEY'))
+                    session_save("analise", agent.refresh_section(session_load("curriculo"), secao,
+                                                                  analysis=session_load("analise")))
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"❌ Erro ao regenerar seção: {str(e)}")
+                    logger.error(f"Erro: {e}", exc_info=True)
+    
+    with st.expander("📝 Enviar versão revisada do currículo"):
+        st.caption("Apenas as seções alteradas são reanalisadas; mudanças grandes refazem a análise completa.")
+        revised_file = st.file_uploader("Currículo revisado", type=['pdf', 'txt'], key="revised_upload",
+                                        label_visibility="collapsed")
+        if revised_file and st.button("Reanalisar", width="stretch"):
+            with st.spinner("🔍 Reanalisando alterações..."):
+                try:
+                    revised_text = read_uploaded_resume(revised_file)
+                    if len(revised_text.strip()) <= 50:
+                        st.warning("⚠️ Arquivo muito curto ou vazio")
+                    else:
+                        agent = CareerIntelligenceAgent(api_key=os.getenv('GOOGLE_API_KEY'))
+                        analysis = agent.analyze_resume(revised_text, user_id=st.session_state.user_id)
+                        session_save("analise", analysis)
+                        session_save("curriculo", revised_text)
+                        session_save("roadmap", None)
+                        save_comparison(None)
+                        record_analysis(analysis)
+                        st.rerun()
+                except Exception as e:
+                    st.error(f"❌ Erro na reanálise: {str(e)}")
+                    logger.error(f"Erro: {e}", exc_info=True)
+    
     st.markdown("---")
     st.markdown("## 🎯 Defina seu Objetivo de Carreira")
     
-    if st.session_state.career_goal is None:
+    career_goal = session_load("objetivo")
+    career_goals = session_load("objetivos")
+    
+    if career_goals:
+        goals = career_goals
+        st.markdown(f"### ⚖️ Comparando {len(goals)} objetivos")
+        results = load_comparison()
+        
+        if results is None:
+            # Os roadmaps são gerados em paralelo e a tabela é atualizada a cada um que termina
+            table = st.empty()
+            results = {}
+            table.dataframe(comparison_rows(goals, results), hide_index=True, use_container_width=True)
+            try:
+                agent = CareerIntelligenceAgent(api_key=os.getenv('GOOGLE_API_KEY'))
+                for goal, roadmap, error in agent.iter_career_roadmaps(session_load("curriculo"), goals):
+                    results[goal] = str(error) if error is not None else Roadmap.from_dict(roadmap)
+                    table.dataframe(comparison_rows(goals, results), hide_index=True, use_container_width=True)
+                save_comparison(results)
+                st.rerun()
+            except Exception as e:
+                st.error(f"❌ Erro ao comparar objetivos: {str(e)}")
+                logger.error(f"Erro: {e}", exc_info=True)
+                if st.button("⬅️ Voltar"):
+                    session_save("objetivos", None)
+                    st.rerun()
+        else:
+            st.dataframe(comparison_rows(goals, results), hide_index=True, use_container_width=True)
+            
+            col_btn1, col_btn2, col_btn3 = st.columns([1, 1, 1])
+            with col_btn2:
+                if st.button("🔄 Mudar Objetivos", use_container_width=True):
+                    session_save("objetivos", None)
+                    save_comparison(None)
+                    st.rerun()
+            
+            st.markdown("---")
+            
+            gerados = [goal for goal in goals if not isinstance(results.get(goal), (str, type(None)))]
+            if gerados:
+                for tab, goal in zip(st.tabs(gerados), gerados):
+                    with tab:
+                        render_roadmap_details(results[goal])
+    
+    elif career_goal is None:
         col1, col2, col3 = st.columns([1, 2, 1])
         
         with col2:
@@ -517,76 +642,96 @@ else:
             </div>
             """, unsafe_allow_html=True)
             
-            career_input = st.text_input(
-                "Digite o cargo ou área que deseja alcançar:",
-                placeholder="Ex: Gerente de Projetos, Arquiteto de Software, Diretor de TI...",
-                label_visibility="collapsed"
-            )
+            comparar = st.toggle("Comparar vários objetivos")
             
-            if st.button("🚀 Gerar Roadmap Personalizado", use_container_width=True, type="primary"):
-                if career_input:
-                    st.session_state.career_goal = career_input
-                    st.rerun()
-                else:
-                    st.warning("⚠️ Digite um objetivo de carreira")
+            if comparar:
+                goals_input = st.text_area(
+                    "Um objetivo por linha:",
+                    placeholder="Tech Lead\nArquiteto de Software\nGerente de Projetos",
+                    label_visibility="collapsed"
+                )
+                
+                if st.button("⚖️ Comparar Roadmaps", use_container_width=True, type="primary"):
+                    goals = list(dict.fromkeys(g.strip() for g in goals_input.splitlines() if g.strip()))
+                    if len(goals) < 2:
+                        st.warning("⚠️ Digite ao menos dois objetivos, um por linha")
+                    elif len(goals) > MAX_COMPARE_GOALS:
+                        st.warning(f"⚠️ Compare no máximo {MAX_COMPARE_GOALS} objetivos por vez")
+                    else:
+                        session_save("objetivos", goals)
+                        save_comparison(None)
+                        st.rerun()
+            else:
+                career_input = st.text_input(
+                    "Digite o cargo ou área que deseja alcançar:",
+                    placeholder="Ex: Gerente de Projetos, Arquiteto de Software, Diretor de TI...",
+                    label_visibility="collapsed"
+                )
+                
+                if st.button("🚀 Gerar Roadmap Personalizado", use_container_width=True, type="primary"):
+                    if career_input:
+                        session_save("objetivo", career_input)
+                        session_save("roadmap", None)
+                        st.rerun()
+                    else:
+                        st.warning("⚠️ Digite um objetivo de carreira")
     else:
-        st.markdown(f"### 🎯 Objetivo: **{st.session_state.career_goal}**")
+        st.markdown(f"### 🎯 Objetivo: **{career_goal}**")
+        roadmap = session_load("roadmap", Roadmap)
         
-        if st.session_state.roadmap is None:
+        if roadmap is None:
             with st.spinner("🔮 Gerando seu roadmap personalizado..."):
                 api_key = os.getenv('GOOGLE_API_KEY')
                 roadmap = generate_career_roadmap(
-                    st.session_state.curriculo_text,
-                    st.session_state.career_goal,
+                    session_load("curriculo"),
+                    career_goal,
                     api_key
                 )
                 
                 if roadmap:
-                    st.session_state.roadmap = roadmap
+                    session_save("roadmap", roadmap)
                     st.rerun()
                 else:
                     st.error("❌ Erro ao gerar roadmap. Tente novamente ou mude o objetivo.")
                     if st.button("🔄 Tentar Novamente"):
                         st.rerun()
                     if st.button("⬅️ Voltar"):
-                        st.session_state.career_goal = None
+                        session_save("objetivo", None)
                         st.rerun()
         else:
-            roadmap = st.session_state.roadmap
-            
             # Métricas principais
             col1, col2, col3 = st.columns(3)
             
             with col1:
-                viavel = roadmap.get('objetivo_viavel', True)
+                viavel = roadmap.objetivo_viavel
                 st.markdown(f"""
                 <div class='metric-card'>
                     <div class='stat-label'>Viabilidade</div>
                     <div class='stat-value' style='font-size: 24px;'>{'✓ VIÁVEL' if viavel else '⚠ DESAFIADOR'}</div>
-                    <div style='color: #8b92a7; margin-top: 8px;'>{roadmap.get('prazo_estimado', 'N/A')}</div>
+                    <div style='color: #8b92a7; margin-top: 8px;'>{roadmap.prazo_estimado or 'N/A'}</div>
                 </div>
                 """, unsafe_allow_html=True)
             
             with col2:
-                prob = roadmap.get('probabilidade_sucesso', 'média')
+                prob = roadmap.probabilidade_sucesso
                 prob_percent = {'alta': '75-90%', 'média': '50-70%', 'baixa': '20-40%'}
                 color = '#00ffaa' if prob == 'alta' else '#ffaa00' if prob == 'média' else '#ff6b6b'
                 st.markdown(f"""
                 <div class='metric-card'>
                     <div class='stat-label'>Probabilidade de Sucesso</div>
                     <div class='stat-value' style='font-size: 24px; color: {color};'>{prob.upper()}</div>
-                    <div style='color: #8b92a7; margin-top: 8px;'>{prob_percent.get(prob, 'N/A')}</div>
+                    <div style='color: #8b92a7; margin-top: 8px;'>{prob_percent[prob]}</div>
                 </div>
                 """, unsafe_allow_html=True)
             
             with col3:
-                nivel = roadmap.get('nivel_desafio', 'médio')
+                nivel = roadmap.nivel_desafio
                 nivel_color = '#ffaa00' if nivel == 'médio' else '#ff6b6b' if nivel == 'alto' else '#00ffaa'
                 st.markdown(f"""
                 <div class='metric-card'>
                     <div class='stat-label'>Nível de Desafio</div>
                     <div class='stat-value' style='font-size: 24px; color: {nivel_color};'>{nivel.upper()}</div>
-                    <div style='color: #8b92a7; margin-top: 8px;'>{roadmap.get('investimento_estimado', 'Consulte detalhes')}</div>
+                    <div style='color: #8b92a7; margin-top: 8px;'>{roadmap.investimento_estimado or 'Consulte detalhes'}</div>
                 </div>
                 """, unsafe_allow_html=True)
             
@@ -594,72 +739,10 @@ else:
             col_btn1, col_btn2, col_btn3 = st.columns([1, 1, 1])
             with col_btn2:
                 if st.button("🔄 Mudar Objetivo", use_container_width=True):
-                    st.session_state.career_goal = None
-                    st.session_state.roadmap = None
+                    session_save("objetivo", None)
+                    session_save("roadmap", None)
                     st.rerun()
             
             st.markdown("---")
             
-            # Cargos intermediários se existirem
-            cargos_inter = roadmap.get('cargos_intermediarios', [])
-            if cargos_inter:
-                st.markdown("#### 🎯 Cargos Intermediários Recomendados")
-                st.markdown("Para facilitar a transição, considere estas posições estratégicas:")
-                for i, cargo in enumerate(cargos_inter, 1):
-                    st.markdown(f"{i}. **{cargo}**")
-                st.markdown("---")
-            
-            st.markdown("### 🗺️ Roadmap Estratégico de Desenvolvimento")
-            
-            etapas = roadmap.get('etapas', [])
-            if not etapas:
-                st.warning("⚠️ Nenhuma etapa foi gerada no roadmap")
-            else:
-                for etapa in etapas:
-                    ordem = etapa.get('ordem', '?')
-                    titulo = etapa.get('titulo', 'Etapa sem título')
-                    prazo = etapa.get('prazo', 'Prazo não definido')
-                    
-                    with st.expander(f"**Etapa {ordem}:** {titulo} ({prazo})", expanded=(ordem == 1)):
-                        acoes = etapa.get('acoes', [])
-                        if acoes:
-                            st.markdown("**🎯 Ações Estratégicas:**")
-                            for acao in acoes:
-                                st.markdown(f"• {acao}")
-                            st.markdown("")
-                        
-                        skills = etapa.get('skills_desenvolver', [])
-                        if skills:
-                            st.markdown("**💡 Skills a Desenvolver:**")
-                            cols = st.columns(min(len(skills), 3))
-                            for i, skill in enumerate(skills):
-                                with cols[i % len(cols)]:
-                                    st.markdown(f"`{skill}`")
-                            st.markdown("")
-                        
-                        recursos = etapa.get('recursos', [])
-                        if recursos:
-                            st.markdown("**📚 Recursos Recomendados:**")
-                            for recurso in recursos:
-                                st.markdown(f"• {recurso}")
-                            st.markdown("")
-                        
-                        indicadores = etapa.get('indicadores_sucesso', [])
-                        if indicadores:
-                            st.markdown("**✅ Indicadores de Sucesso:**")
-                            for indicador in indicadores:
-                                st.markdown(f"☑️ {indicador}")
-            
-            # Fatores críticos
-            fatores = roadmap.get('fatores_criticos', [])
-            if fatores:
-                st.markdown("---")
-                st.markdown("### ⚡ Fatores Críticos de Sucesso")
-                for fator in fatores:
-                    st.warning(f"🔑 {fator}")
-            
-            # Observações estratégicas
-            if roadmap.get('observacoes'):
-                st.markdown("---")
-                st.markdown("### 💼 Análise Estratégica")
-                st.info(roadmap.get('observacoes'))
+            render_roadmap_details(roadmap)
@@ -0,0 +1,85 @@
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Orçamento de importação (ms, mediana) por módulo; dependências pesadas não podem ser carregadas no import
+BUDGETS_MS = {
+    "career_agent": 30,
+    "career_models": 10,
+    "model_router": 10,
+    "hedging": 15,
+    "result_cache": 15,
+    "resume_sections": 10,
+    "session_store": 10,
+    "token_budget": 10,
+    "transport": 10,
+}
+
+HEAVY_MODULES = ["requests", "urllib3", "numpy", "pandas", "pyarrow", "PyPDF2", "plotly", "dotenv", "streamlit", "sqlite3"]
+
+PROBE = """
+import sys, time, json, logging
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{
+    "ms": elapsed,
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+    "root_handlers": len(logging.getLogger().handlers)
+}}))
+"""
+
+
+def measure(module: str, runs: int) -> dict:
+    samples, result = [], None
+    for _ in range(runs):
+        # Processo novo a cada execução: mede o cold start real, sem cache de sys.modules
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        samples.append(result["ms"])
+    return {"median_ms": statistics.median(samples), "heavy": result["heavy"],
+            "root_handlers": result["root_handlers"]}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de tempo de importação com orçamento de regressão")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--scale", type=float, default=float(os.getenv("CVISION_IMPORT_BUDGET_SCALE", "1.0")),
+                        help="Multiplicador dos orçamentos (ex: 2.0 em máquinas de CI lentas)")
+    args = parser.parse_args()
+
+    failures = []
+    for module, budget in BUDGETS_MS.items():
+        result = measure(module, args.runs)
+        limit = budget * args.scale
+        status = "OK"
+        if result["median_ms"] > limit:
+            failures.append(f"{module}: {result['median_ms']:.1f}ms > orçamento {limit:.0f}ms")
+            status = "LENTO"
+        if result["heavy"]:
+            failures.append(f"{module}: importa dependências pesadas no carregamento: {', '.join(result['heavy'])}")
+            status = "PESADO"
+        if result["root_handlers"]:
+            failures.append(f"{module}: configura logging global no import")
+            status = "EFEITO COLATERAL"
+        print(f"{module:<18} {result['median_ms']:>7.1f}ms  (orçamento {limit:.0f}ms)  {status}")
+
+    if failures:
+        print("\n❌ Regressões de cold start:")
+        for failure in failures:
+            print(f"   • {failure}")
+        return 1
+    print("\n✅ Tempos de importação dentro do orçamento")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
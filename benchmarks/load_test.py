@@ -0,0 +1,83 @@
+import sys
+import json
+import time
+import argparse
+import statistics
+import urllib.request
+import urllib.error
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+SAMPLE_RESUME = """
+JOÃO SILVA
+Desenvolvedor de Software
+
+EXPERIÊNCIA:
+- Desenvolvedor Full Stack na Tech Corp (2021-2023)
+  * Desenvolvimento de aplicações web com React e Node.js
+  * Implementação de APIs RESTful
+- Desenvolvedor Junior na StartupXYZ (2019-2021)
+  * Manutenção de código legacy
+  * Criação de testes unitários
+
+HABILIDADES:
+JavaScript, React, Node.js, SQL, Git
+
+FORMAÇÃO:
+Bacharelado em Ciência da Computação (2015-2019)
+"""
+
+
+def send(url: str, body: dict, deadline: float) -> tuple:
+    data = json.dumps(body).encode('utf-8')
+    request = urllib.request.Request(url, data=data, method="POST", headers={
+        "Content-Type": "application/json",
+        "X-Request-Deadline": str(deadline)
+    })
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=deadline + 10) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except Exception:
+        status = 0
+    return status, time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Teste de carga do serviço HTTP do CVision AI")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--endpoint", default="/v1/analyze", choices=["/v1/analyze", "/v1/chat", "/v1/roadmap"])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--deadline", type=float, default=120)
+    parser.add_argument("--resume", help="Arquivo de texto com o currículo (padrão: exemplo embutido)")
+    args = parser.parse_args()
+
+    resume = open(args.resume, encoding='utf-8').read() if args.resume else SAMPLE_RESUME
+    bodies = {
+        "/v1/analyze": {"resume_text": resume},
+        "/v1/chat": {"message": "Quais certificações ajudam a chegar a Tech Lead?"},
+        "/v1/roadmap": {"resume_text": resume, "career_goal": "Tech Lead"},
+    }
+    url = args.url.rstrip('/') + args.endpoint
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(lambda _: send(url, bodies[args.endpoint], args.deadline), range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    statuses = Counter(status for status, _ in results)
+    ok = sorted(latency for status, latency in results if status == 200)
+    print(f"Requisições: {args.requests} em {elapsed:.1f}s ({args.requests / elapsed * 60:.0f}/min, concorrência {args.concurrency})")
+    print(f"Status: {dict(sorted(statuses.items()))}")
+    if ok:
+        print(f"Latência (200): p50={statistics.median(ok):.2f}s "
+              f"p95={ok[min(len(ok) - 1, int(len(ok) * 0.95))]:.2f}s max={ok[-1]:.2f}s")
+    return 0 if statuses.get(200) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from career_agent import CareerIntelligenceAgent  # noqa: E402
+from result_cache import ResultCache  # noqa: E402
+from session_store import SessionStore  # noqa: E402
+from token_budget import OutputBudgeter  # noqa: E402
+from hedging import Hedger, HedgePolicy  # noqa: E402
+from transport import ReplayTransport  # noqa: E402
+
+# A chave nunca é enviada: todas as respostas vêm do cassete
+PLACEHOLDER_KEY = "AIza" + "0" * 35
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def run_operation(agent: CareerIntelligenceAgent, transport: ReplayTransport, operation: dict) -> dict:
+    transport.reset_network_time()
+    start, cpu_start = time.perf_counter(), time.thread_time()
+    error = None
+    try:
+        getattr(agent, operation["name"])(**operation["arguments"])
+    except Exception as e:
+        error = type(e).__name__
+    wall = time.perf_counter() - start
+    # Sobrecarga do cliente: tempo total menos o tempo com rede simulada em andamento, em qualquer thread da operação
+    return {"name": operation["name"], "wall": wall, "network": transport.network_time(),
+            "overhead": max(0.0, wall - transport.network_time()), "cpu": time.thread_time() - cpu_start,
+            "error": error}
+
+
+def summarize(results: list, elapsed: float, transport: ReplayTransport) -> dict:
+    by_name = {}
+    for result in results:
+        by_name.setdefault(result["name"], []).append(result)
+    operations = {}
+    for name, items in sorted(by_name.items()):
+        overhead = [r["overhead"] * 1000 for r in items]
+        operations[name] = {
+            "total": len(items),
+            "erros": sum(1 for r in items if r["error"]),
+            "latencia_p50_ms": statistics.median(r["wall"] * 1000 for r in items),
+            "sobrecarga_p50_ms": statistics.median(overhead),
+            "sobrecarga_p95_ms": percentile(overhead, 0.95),
+            "cpu_medio_ms": statistics.mean(r["cpu"] * 1000 for r in items),
+        }
+    return {"operacoes_total": len(results), "duracao_s": elapsed,
+            "vazao_por_min": len(results) / elapsed * 60 if elapsed else 0.0,
+            "operacoes": operations, "transporte": transport.stats()}
+
+
+def compare(current: dict, baseline: dict):
+    print("\nComparação com a linha de base (sobrecarga p50 / p95, ms):")
+    for name, stats in current["operacoes"].items():
+        base = baseline.get("operacoes", {}).get(name)
+        if base is None:
+            print(f"  {name}: sem linha de base")
+            continue
+        for metric in ("sobrecarga_p50_ms", "sobrecarga_p95_ms"):
+            before, after = base[metric], stats[metric]
+            delta = (after - before) / before * 100 if before else 0.0
+            print(f"  {name} {metric}: {before:.1f} -> {after:.1f} ({delta:+.0f}%)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Reproduz um cassete gravado para medir a sobrecarga do cliente sem rede")
+    parser.add_argument("cassette", help="Arquivo JSONL gravado com CVISION_TRANSPORT=record")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Aceleração das latências e dos intervalos gravados (0 = sem espera)")
+    parser.add_argument("--timing", choices=["original", "burst"], default="original",
+                        help="original respeita os intervalos entre operações; burst dispara tudo de uma vez")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=1, help="Reproduz a sequência N vezes (cache novo em cada uma)")
+    parser.add_argument("--output", help="Grava o resumo em JSON (para comparar versões)")
+    parser.add_argument("--baseline", help="Resumo JSON de outra versão para comparação")
+    parser.add_argument("--hedge", action="store_true", help="Ativa o hedge (use se a gravação foi feita com CVISION_HEDGE)")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Usa um índice de duplicatas novo por repetição (se a gravação usou CVISION_DEDUP_INDEX)")
+    args = parser.parse_args()
+
+    transport = ReplayTransport(args.cassette, speed=args.speed, strict=False)
+    if not transport.operations:
+        print("Cassete sem operações gravadas.")
+        return 1
+
+    # Um agente por repetição com todo o estado novo (cache, revisões por usuário, orçamento de saída, hedge,
+    # duplicatas), como o processo gravado: sem isso, a partir da segunda passada as análises com user_id
+    # seguiriam o caminho incremental "sem alterações" sem nenhuma chamada e as versões não seriam comparáveis
+    dedup_dir = tempfile.mkdtemp(prefix="cvision-replay-") if args.dedup else None
+    agents = []
+    for i in range(args.repeat):
+        agent = CareerIntelligenceAgent(api_key=PLACEHOLDER_KEY, transport=transport, cache=ResultCache(),
+                                        session_store=SessionStore(), budgeter=OutputBudgeter())
+        # O construtor usa os padrões do ambiente para None; aqui só entra o que a linha de comando pedir
+        agent.quota = None
+        agent.hedger = Hedger(HedgePolicy.from_env()) if args.hedge else None
+        if args.dedup:
+            from dedup_index import MinHashLSHIndex
+            agent.dedup_index = MinHashLSHIndex(os.path.join(dedup_dir, f"dedup-{i}.sqlite"))
+        else:
+            agent.dedup_index = None
+        agents.append(agent)
+
+    first = transport.operations[0]["offset"]
+    span = transport.operations[-1]["offset"] - first
+    schedule = [(agent, op, (op["offset"] - first + i * span)) for i, agent in enumerate(agents)
+                for op in transport.operations]
+    scale = 1.0 / args.speed if args.speed > 0 and args.timing == "original" else 0.0
+
+    results, lock = [], threading.Lock()
+
+    def task(agent, operation):
+        result = run_operation(agent, transport, operation)
+        with lock:
+            results.append(result)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for agent, operation, offset in schedule:
+            wait = offset * scale - (time.perf_counter() - start)
+            if wait > 0:
+                time.sleep(wait)
+            executor.submit(task, agent, operation)
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(results, elapsed, transport)
+    print(f"Operações: {summary['operacoes_total']} em {elapsed:.1f}s "
+          f"({summary['vazao_por_min']:.0f}/min, concorrência {args.concurrency}, velocidade {args.speed:g})")
+    for name, stats in summary["operacoes"].items():
+        print(f"  {name}: {stats['total']} ({stats['erros']} erros) latência p50={stats['latencia_p50_ms']:.1f}ms "
+              f"sobrecarga p50={stats['sobrecarga_p50_ms']:.1f}ms p95={stats['sobrecarga_p95_ms']:.1f}ms "
+              f"cpu={stats['cpu_medio_ms']:.1f}ms")
+    counters = summary["transporte"]
+    print(f"Trocas servidas: {counters['servidas']} (sem modelo: {counters['por_chave_sem_modelo']}, "
+          f"ausentes: {counters['ausentes']})")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            compare(summary, json.load(f))
+    return 0 if not counters["ausentes"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
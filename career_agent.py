@@ -1,16 +1,117 @@
 import os
 import re
-import requests
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Tuple, List, Iterator, Optional, TYPE_CHECKING
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from model_router import ModelRouter, get_default_router, estimate_tokens
+from hedging import Hedger, get_default_hedger
+from quota import QuotaCoordinator, QuotaExceeded, get_default_quota
+from token_budget import OutputBudgeter, get_default_budgeter
+from result_cache import ResultCache, get_default_cache, cache_key
+from resume_sections import chunk_document, diff_sections, change_ratio, change_hunks
+from career_models import Analysis, Roadmap, coerce_number
+from transport import get_default_transport, submit_in_context
+from session_store import SessionStore, get_default_session_store
+
+# requests só é importado na primeira chamada à API (cold start de workers)
+if TYPE_CHECKING:
+    import requests
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+
+class GeminiAPIError(ValueError):
+    
+    def __init__(self, message: str, status_code: int = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com/v1beta/models"
+
+MAX_RESUME_CHARS = 50000
+MAX_DOCUMENT_CHARS = int(os.getenv('CVISION_MAX_DOCUMENT_CHARS', '500000'))
+CHUNK_CHARS = 12000
+ROADMAP_CONTEXT_CHARS = 12000
+MAX_COMPARE_GOALS = 5
+FACTS_PROMPT_VERSION = "v1"
+
+CONTINUATION_PROMPT = ("Sua resposta anterior foi interrompida pelo limite de tamanho. Continue exatamente do "
+                       "ponto onde parou, sem repetir nada e sem reiniciar o JSON ou adicionar markdown.")
+
+SECTION_PROMPT_VERSION = "v1"
+FIT_PROMPT_VERSION = "v1"
+MAX_JOB_DESCRIPTION_CHARS = 20000
+
+FIT_JSON_FORMAT = """{
+    "aderencia": número de 0 a 100,
+    "recomendacao": "avançar/talvez/não avançar",
+    "pontos_fortes": ["evidência concreta do currículo"],
+    "lacunas": ["requisito da vaga não atendido"],
+    "resumo": "2-3 frases objetivas"
+}"""
+
+# Seções independentes da análise: cada uma pode ser gerada e regenerada isoladamente
+ANALYSIS_SECTIONS = {
+    "perfil": {
+        "foco": "profissão real baseada em experiências e responsabilidades, e nível de senioridade atual",
+        "chaves": ["profissao_real", "nivel_senioridade"],
+        "max_output_tokens": 1024,
+        "formato": """    "profissao_real": {"titulo": "título claro", "descricao": "descrição prática", "nivel_confianca": "alto/médio/baixo"},
+    "nivel_senioridade": {"nivel": "Júnior/Pleno/Sênior/Especialista", "anos_experiencia": número, "justificativa": "análise detalhada"}"""
+    },
+    "lacunas": {
+        "foco": "lacunas técnicas e comportamentais em relação ao próximo passo natural da carreira",
+        "chaves": ["lacunas"],
+        "max_output_tokens": 2048,
+        "formato": """    "lacunas": {
+        "tecnicas": [{"skill": "skill específica", "importancia": "alta/média/baixa", "como_desenvolver": "ação prática"}],
+        "comportamentais": [{"competencia": "competência clara", "importancia": "alta/média/baixa", "como_desenvolver": "conselho prático"}]
+    }"""
+    },
+    "proximo_cargo": {
+        "foco": "próximo cargo lógico na carreira, com prazo, requisitos e probabilidade",
+        "chaves": ["proximo_cargo"],
+        "max_output_tokens": 1024,
+        "formato": """    "proximo_cargo": {"cargo": "título realista", "prazo_estimado": "timeframe", "requisitos": ["item claro"], "probabilidade": "alta/média/baixa"}"""
+    },
+    "plano_crescimento": {
+        "foco": "plano prático de desenvolvimento profissional em etapas",
+        "chaves": ["plano_crescimento"],
+        "max_output_tokens": 4096,
+        "formato": """    "plano_crescimento": {
+        "objetivo": "objetivo inspirador mas alcançável",
+        "prazo_total": "prazo realista",
+        "etapas": [{"numero": 1, "titulo": "fase clara", "prazo": "tempo", "acoes": ["ação específica"], "recursos": ["recurso útil"], "indicadores_sucesso": ["métrica clara"]}],
+        "certificacoes_sugeridas": ["certificação relevante"],
+        "cursos_recomendados": ["curso específico"]
+    }"""
+    },
+}
+
+ANALYSIS_KEYS = [key for spec in ANALYSIS_SECTIONS.values() for key in spec["chaves"]]
+
+ANALYSIS_JSON_FORMAT = "{\n" + ",\n".join(spec["formato"] for spec in ANALYSIS_SECTIONS.values()) + "\n}"
+
+FACTS_JSON_FORMAT = """{
+    "experiencias": [{"cargo": "cargo", "empresa": "empresa", "periodo": "início-fim", "destaques": ["responsabilidade ou resultado"]}],
+    "habilidades": ["skill"],
+    "formacao": ["curso - instituição (ano)"],
+    "certificacoes": ["certificação"],
+    "projetos_publicacoes": ["título curto"],
+    "idiomas": ["idioma - nível"],
+    "anos_experiencia_estimados": número ou null
+}"""
+
 class CareerIntelligenceAgent:
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, dedup_index=None, router: ModelRouter = None,
+                 hedger: Hedger = None, cache: ResultCache = None, sectioned: bool = None,
+                 quota: QuotaCoordinator = None, budgeter: OutputBudgeter = None, transport=None,
+                 session_store: SessionStore = None):
         self.api_key = api_key or os.getenv('GOOGLE_API_KEY')
         if not self.api_key:
             raise ValueError("Chave do Gemini não fornecida. Configure GOOGLE_API_KEY.")
@@ -19,18 +120,42 @@ class CareerIntelligenceAgent:
             raise ValueError("Formato de chave do Gemini inválido.")
         
         self.model_name = os.getenv('GEMINI_MODEL', 'gemini-2.5-flash')
-        self.api_url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model_name}:generateContent"
+        self.api_url = self._model_url(self.model_name)
+        self.router = router or get_default_router()
+        self.hedger = hedger or get_default_hedger()
+        self.quota = quota or get_default_quota()
+        self.budgeter = budgeter or get_default_budgeter()
+        # Gravação ou reprodução de cassetes (CVISION_TRANSPORT=record|replay); None usa a rede diretamente
+        self.transport = transport or get_default_transport()
+        self.max_continuations = int(os.getenv('CVISION_MAX_CONTINUATIONS', '2'))
+        self.cache = cache or get_default_cache()
+        self.map_workers = int(os.getenv('CVISION_MAP_WORKERS', '8'))
+        if sectioned is None:
+            sectioned = os.getenv('CVISION_SECTIONED_ANALYSIS', '').lower() in ('1', 'true', 'yes')
+        self.sectioned = sectioned
+        self.incremental_max_change = float(os.getenv('CVISION_INCREMENTAL_MAX_CHANGE', '0.35'))
+        # Última versão de cada usuário, no mesmo store limitado em bytes das sessões da interface
+        self.session_store = session_store or get_default_session_store()
+        
+        self.dedup_threshold = float(os.getenv('CVISION_DEDUP_THRESHOLD', '0.9'))
+        if dedup_index is None and os.getenv('CVISION_DEDUP_INDEX'):
+            from dedup_index import MinHashLSHIndex
+            dedup_index = MinHashLSHIndex(os.getenv('CVISION_DEDUP_INDEX'))
+        self.dedup_index = dedup_index
         
         logger.info(f"Agente inicializado com sucesso (chave: {self.api_key[:10]}..., modelo: {self.model_name})")
     
     def _validate_api_key(self, api_key: str) -> bool:
         return len(api_key) > 20 and api_key.startswith('AIza')
     
-    def _sanitize_input(self, text: str) -> str:
+    @staticmethod
+    def _model_url(model: str) -> str:
+        return f"{GEMINI_API_BASE}/{model}:generateContent"
+    
+    def _sanitize_input(self, text: str, max_size: int = MAX_RESUME_CHARS) -> str:
         if not text or not isinstance(text, str):
             raise ValueError("Texto do currículo inválido.")
         
-        max_size = 50000
         if len(text) > max_size:
             raise ValueError(f"Texto muito grande. Máximo: {max_size} caracteres.")
         
@@ -38,7 +163,235 @@ class CareerIntelligenceAgent:
         
         return text.strip()
     
+    def _post(self, model: str, payload: Dict[str, Any], timeout: int,
+              session: "requests.Session" = None) -> "requests.Response":
+        import requests
+        
+        def send():
+            return (session or requests).post(
+                f"{self._model_url(model)}?key={self.api_key}",
+                headers={"Content-Type": "application/json"},
+                json=payload,
+                timeout=timeout
+            )
+        
+        if self.transport is not None:
+            return self.transport.post(model, payload, timeout, send)
+        return send()
+    
+    def _record_operation(self, name: str, **arguments):
+        # Em modo de gravação, a operação entra no cassete para ser reproduzida em testes de carga
+        record = getattr(self.transport, "record_operation", None)
+        if record is not None:
+            record(name, arguments)
+    
+    def _reserve(self, model: str, payload: Dict[str, Any], wait: bool = True) -> Optional[Tuple[int, int]]:
+        if self.quota is None:
+            return None
+        # Reserva a capacidade no coordenador do host antes de chamar o Gemini
+        reserved_tokens = (sum(estimate_tokens(part["text"]) for content in payload["contents"]
+                               for part in content["parts"])
+                           + payload["generationConfig"]["maxOutputTokens"])
+        return self.quota.reserve(model, reserved_tokens, timeout=None if wait else 0), reserved_tokens
+    
+    def _call_model(self, model: str, payload: Dict[str, Any], timeout: int,
+                    session: "requests.Session" = None, reservation: Tuple[int, int] = None,
+                    wait_quota: bool = True) -> "requests.Response":
+        import requests
+        if reservation is None:
+            reservation = self._reserve(model, payload, wait=wait_quota)
+        
+        start = time.monotonic()
+        used = 0
+        try:
+            response = self._post(model, payload, timeout, session=session)
+        except requests.RequestException:
+            # Perdedor de um hedge cancelado não conta como falha do modelo
+            if not getattr(session, "cancelled", False):
+                self.router.record(model, time.monotonic() - start, ok=False)
+            raise
+        else:
+            self.router.record(model, time.monotonic() - start, ok=response.status_code == 200)
+            if reservation is not None and response.status_code == 200:
+                used = response.json().get("usageMetadata", {}).get("totalTokenCount", reservation[1])
+        finally:
+            # A reserva é sempre ajustada, inclusive quando a requisição falha
+            if reservation is not None:
+                self.quota.settle(reservation[0], used)
+        return response
+    
+    @staticmethod
+    def _candidate_text(result_data: Dict[str, Any]) -> Tuple[str, str]:
+        candidates = result_data.get('candidates') or []
+        if not candidates:
+            reason = result_data.get('promptFeedback', {}).get('blockReason', 'sem candidatos')
+            raise GeminiAPIError(f"Resposta vazia da API Gemini ({reason})")
+        candidate = candidates[0]
+        parts = candidate.get('content', {}).get('parts') or []
+        text = ''.join(part.get('text', '') for part in parts if not part.get('thought'))
+        return text, candidate.get('finishReason', 'STOP')
+    
+    @staticmethod
+    def _output_tokens(result_data: Dict[str, Any]) -> int:
+        usage = result_data.get('usageMetadata', {})
+        return usage.get('candidatesTokenCount', 0) + usage.get('thoughtsTokenCount', 0)
+    
+    def _complete(self, task: str, model: str, payload: Dict[str, Any], result_data: Dict[str, Any],
+                  input_tokens: int, ceiling: int, timeout: int) -> str:
+        import requests
+        text, finish_reason = self._candidate_text(result_data)
+        output_tokens = self._output_tokens(result_data)
+        truncated = finish_reason == 'MAX_TOKENS'
+        budget = payload["generationConfig"]["maxOutputTokens"]
+        
+        # Orçamento consumido sem texto (ex: só raciocínio): repete uma vez com o teto da tarefa
+        if truncated and not text.strip() and budget < ceiling:
+            logger.warning(f"Resposta de {task} sem texto com {budget} tokens. Repetindo com {ceiling}...")
+            payload = {**payload, "generationConfig": {**payload["generationConfig"], "maxOutputTokens": ceiling}}
+            try:
+                response = self._call_model(model, payload, timeout)
+            except (requests.RequestException, QuotaExceeded) as e:
+                logger.error(f"Erro ao repetir {task}: {type(e).__name__}")
+                response = None
+            if response is not None and response.status_code == 200:
+                result_data = response.json()
+                text, finish_reason = self._candidate_text(result_data)
+                output_tokens = self._output_tokens(result_data)
+        
+        continuations = 0
+        while finish_reason == 'MAX_TOKENS' and text.strip() and continuations < self.max_continuations:
+            continuations += 1
+            logger.warning(f"Resposta de {task} truncada ({output_tokens} tokens de saída). "
+                           f"Solicitando continuação {continuations}...")
+            continuation_payload = {
+                "contents": payload["contents"] + [
+                    {"role": "model", "parts": [{"text": text}]},
+                    {"role": "user", "parts": [{"text": CONTINUATION_PROMPT}]}
+                ],
+                "generationConfig": payload["generationConfig"]
+            }
+            # Falha na continuação mantém o texto parcial já recebido
+            try:
+                response = self._call_model(model, continuation_payload, timeout)
+            except (requests.RequestException, QuotaExceeded) as e:
+                logger.error(f"Erro na continuação de {task}: {type(e).__name__}")
+                break
+            if response.status_code != 200:
+                logger.error(f"Erro {response.status_code} na continuação de {task}")
+                break
+            continuation_data = response.json()
+            try:
+                piece, finish_reason = self._candidate_text(continuation_data)
+            except GeminiAPIError as e:
+                logger.error(f"Erro na continuação de {task}: {e}")
+                break
+            # O modelo às vezes reabre o bloco de código ao continuar
+            text += re.sub(r'^\s*```(?:json)?\n?', '', piece)
+            output_tokens += self._output_tokens(continuation_data)
+        
+        self.budgeter.record(task, input_tokens, output_tokens, truncated)
+        if finish_reason == 'MAX_TOKENS':
+            logger.error(f"Resposta de {task} continua truncada após {continuations} continuações")
+        elif finish_reason != 'STOP':
+            logger.warning(f"Resposta de {task} finalizada com {finish_reason}")
+        return text
+    
+    @staticmethod
+    def _model_not_found(response: "requests.Response") -> bool:
+        if response.status_code == 404:
+            return True
+        if response.status_code != 400:
+            return False
+        text = response.text.lower()
+        return "not found" in text or "is not supported" in text
+    
+    def _generate(self, task: str, prompt: str, temperature: float, max_output_tokens: int, timeout: int) -> str:
+        input_tokens = estimate_tokens(prompt)
+        budget, reason = self.budgeter.budget(task, input_tokens, max_output_tokens)
+        logger.info(f"Orçamento de saída para {task}: {budget}/{max_output_tokens} tokens ({reason})")
+        
+        payload = {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": {
+                "temperature": temperature,
+                "maxOutputTokens": budget
+            }
+        }
+        
+        import requests
+        models = self.router.route(task, input_tokens, budget)
+        last_status = None
+        for i, model in enumerate(models):
+            if i > 0:
+                logger.warning(f"Tentando modelo alternativo: {model}")
+            
+            try:
+                if self.hedger is not None:
+                    hedge_model = models[i + 1] if self.hedger.policy.target == "fallback" and i + 1 < len(models) else model
+                    # A espera por cota acontece antes do hedge e não conta no seu atraso;
+                    # a duplicada só sai se houver cota imediata, sem disputar capacidade escassa
+                    reservation = self._reserve(model, payload)
+                    response = self.hedger.execute(
+                        task, model, hedge_model,
+                        lambda m, session: self._call_model(m, payload, timeout, session=session,
+                                                            reservation=reservation),
+                        hedge_call=lambda m, session: self._call_model(m, payload, timeout, session=session,
+                                                                       wait_quota=False)
+                    )
+                else:
+                    response = self._call_model(model, payload, timeout)
+            except requests.RequestException as e:
+                logger.error(f"Erro no modelo {model}: {type(e).__name__}")
+                continue
+            except QuotaExceeded as e:
+                logger.warning(str(e))
+                last_status = 429
+                continue
+            
+            if response.status_code == 200:
+                if i > 0:
+                    logger.info(f"Sucesso com modelo: {model}")
+                return self._complete(task, model, payload, response.json(), input_tokens, max_output_tokens, timeout)
+            
+            if self._model_not_found(response):
+                # Modelo aposentado ou indisponível para a chave: segue a rota sem mascarar o status anterior (ex: 429)
+                logger.warning(f"Modelo {model} não encontrado ({response.status_code})")
+                last_status = last_status or response.status_code
+                continue
+            
+            last_status = response.status_code
+            if response.status_code == 429:
+                logger.warning(f"Rate limit atingido no modelo {model}")
+                continue
+            if response.status_code >= 500:
+                logger.warning(f"Erro {response.status_code} no modelo {model}")
+                continue
+            
+            logger.error(f"Erro API: {response.status_code} - {response.text[:200]}")
+            raise GeminiAPIError(f"Erro na API Gemini: {response.status_code}", response.status_code)
+        
+        logger.error(f"Todos os modelos falharam. Status: {last_status}")
+        if last_status == 429:
+            raise GeminiAPIError("Limite diário atingido. Aguarde algumas horas ou use outra API key.", 429)
+        raise GeminiAPIError(f"Erro na API Gemini: {last_status or 'sem resposta'}", last_status)
+    
+    @staticmethod
+    def _parse_json_response(text: str) -> Dict[str, Any]:
+        # Limpar markdown e espaços
+        text = text.strip()
+        if '```json' in text:
+            start_idx = text.find('```json') + 7
+            end_idx = text.rfind('```')
+            if end_idx > start_idx:
+                text = text[start_idx:end_idx]
+        elif text.startswith('```'):
+            lines = text.split('\n')
+            text = '\n'.join(lines[1:-1]) if len(lines) > 2 else text
+        text = text.replace('```', '').strip()
+        return json.loads(text)
+    
     def chat(self, message: str, context: str = "") -> str:
+        self._record_operation("chat", message=message, context=context)
         prompt = f"""Consultor de carreira sênior especializado em tecnologia.
 
 Orientações:
@@ -53,60 +406,256 @@ Pergunta: {message}
 Resposta:"""
 
         try:
-            payload = {
-                "contents": [{"parts": [{"text": prompt}]}],
-                "generationConfig": {
-                    "temperature": 0.8,
-                    "maxOutputTokens": 2048
-                }
-            }
-            
-            headers = {"Content-Type": "application/json"}
-            response = requests.post(
-                f"{self.api_url}?key={self.api_key}",
-                headers=headers,
-                json=payload,
-                timeout=60
-            )
-            
-            if response.status_code == 429:
-                fallback_models = ["gemini-1.5-flash-latest", "gemini-pro"]
-                for model in fallback_models:
-                    try:
-                        fallback_url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
-                        response = requests.post(
-                            f"{fallback_url}?key={self.api_key}",
-                            headers=headers,
-                            json=payload,
-                            timeout=60
-                        )
-                        if response.status_code == 200:
-                            break
-                    except:
-                        continue
-            
-            if response.status_code != 200:
-                return "Desculpe, tive um problema ao processar sua pergunta. Pode reformular?"
-            
-            result_data = response.json()
-            return result_data['candidates'][0]['content']['parts'][0]['text']
-            
+            return self._generate("chat", prompt, temperature=0.8, max_output_tokens=2048, timeout=60)
+        except ValueError:
+            return "Desculpe, tive um problema ao processar sua pergunta. Pode reformular?"
         except Exception as e:
             logger.error(f"Erro no chat: {e}")
             return "Ops! Algo deu errado. Pode tentar novamente?"
     
-    def analyze_resume(self, resume_text: str) -> Dict[str, Any]:
+    def _extract_chunk_facts(self, chunk: str) -> Dict[str, Any]:
+        key = cache_key("chunk_facts", FACTS_PROMPT_VERSION, chunk)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        prompt = f"""Extraia fatos objetivos deste trecho de currículo. Não invente nem avalie; apenas registre o que está escrito.
+
+TRECHO:
+{chunk}
+
+Retorne APENAS JSON (sem markdown), com listas vazias quando não houver informação:
+{FACTS_JSON_FORMAT}"""
+        
+        # Uma nova tentativa em caso de JSON inválido; se falhar de novo, o trecho é contado como ausente
+        for attempt in range(2):
+            text = self._generate("extract_chunk", prompt, temperature=0.2, max_output_tokens=2048, timeout=60)
+            try:
+                facts = self._parse_json_response(text)
+            except json.JSONDecodeError as e:
+                logger.error(f"Erro ao decodificar fatos do trecho (tentativa {attempt + 1}): {e}")
+                continue
+            if isinstance(facts, dict):
+                self.cache.set(key, facts)
+                return facts
+            logger.error(f"Fatos do trecho em formato inesperado (tentativa {attempt + 1})")
+        return None
+    
+    def _extract_facts(self, resume_text: str) -> Dict[str, Any]:
+        chunks = chunk_document(resume_text, CHUNK_CHARS)
+        logger.info(f"Extraindo fatos de {len(chunks)} trechos em paralelo")
+        
+        # Todos os trechos em paralelo: a latência fica próxima à de um único trecho
+        with ThreadPoolExecutor(max_workers=max(1, min(len(chunks), self.map_workers))) as executor:
+            partials = [f.result() for f in [submit_in_context(executor, self._extract_chunk_facts, chunk)
+                                             for chunk in chunks]]
+        
+        merged = {"experiencias": [], "habilidades": [], "formacao": [], "certificacoes": [],
+                  "projetos_publicacoes": [], "idiomas": [], "anos_experiencia_estimados": None}
+        seen = set()
+        missing = sum(1 for facts in partials if facts is None)
+        if missing:
+            logger.warning(f"{missing} de {len(chunks)} trechos sem fatos extraídos")
+        for facts in partials:
+            if facts is None:
+                continue
+            for field, value in facts.items():
+                if field == "anos_experiencia_estimados":
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        current = merged[field]
+                        merged[field] = value if current is None else max(current, value)
+                    continue
+                if not isinstance(value, list):
+                    continue
+                for item in value:
+                    marker = (field, json.dumps(item, ensure_ascii=False, sort_keys=True).lower())
+                    if marker not in seen:
+                        seen.add(marker)
+                        merged.setdefault(field, []).append(item)
+        merged["total_trechos"] = len(chunks)
+        merged["trechos_sem_fatos"] = missing
+        return merged
+    
+    def _resume_block(self, resume_text: str, chunked: bool) -> str:
+        if not chunked:
+            return f"CURRÍCULO:\n{resume_text}"
+        facts = self._extract_facts(resume_text)
+        coverage = ("representam o documento completo" if not facts['trechos_sem_fatos'] else
+                    f"{facts['trechos_sem_fatos']} trechos não puderam ser lidos, então os fatos representam "
+                    f"apenas o restante do documento; não conclua que algo está ausente só por não aparecer aqui")
+        return (f"FATOS DO CURRÍCULO (extraídos de um documento extenso com {len(resume_text)} caracteres "
+                f"e {facts['total_trechos']} trechos; {coverage}):\n"
+                f"{json.dumps(facts, ensure_ascii=False)}")
+    
+    def _analyze_section(self, section: str, resume_block: str, refresh: bool = False) -> Dict[str, Any]:
+        spec = ANALYSIS_SECTIONS[section]
+        key = cache_key("analysis_section", SECTION_PROMPT_VERSION, section, resume_block)
+        if not refresh:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        prompt = f"""Analise este currículo profissionalmente e retorne um JSON estruturado.
+
+Foco: {spec['foco']}
+
+{resume_block}
+
+Retorne APENAS JSON (sem markdown):
+{{
+{spec['formato']}
+}}"""
+        
+        text = self._generate("analyze_section", prompt, temperature=0.7,
+                              max_output_tokens=spec['max_output_tokens'], timeout=90)
+        data = self._parse_json_response(text)
+        missing = [k for k in spec['chaves'] if k not in data]
+        if missing:
+            logger.error(f"Seção {section} sem as chaves: {missing}")
+            raise ValueError("Erro ao processar resposta. Tente novamente.")
+        result = {k: data[k] for k in spec['chaves']}
+        self.cache.set(key, result)
+        return result
+    
+    def _analyze_sectioned(self, resume_block: str, refresh: set = frozenset()) -> Dict[str, Any]:
+        sections = list(ANALYSIS_SECTIONS)
+        with ThreadPoolExecutor(max_workers=len(sections)) as executor:
+            parts = [f.result() for f in [submit_in_context(executor, self._analyze_section, name, resume_block,
+                                                            name in refresh) for name in sections]]
+        
+        result = {}
+        for part in parts:
+            result.update(part)
+        return Analysis.from_dict(result).to_dict()
+    
+    def refresh_section(self, resume_text: str, section: str,
+                        analysis: Dict[str, Any] = None) -> Dict[str, Any]:
+        if section not in ANALYSIS_SECTIONS:
+            raise ValueError(f"Seção inválida: {section}. Opções: {', '.join(ANALYSIS_SECTIONS)}")
+        
+        chunked = isinstance(resume_text, str) and len(resume_text) > MAX_RESUME_CHARS
+        resume_text = self._sanitize_input(resume_text, MAX_DOCUMENT_CHARS if chunked else MAX_RESUME_CHARS)
+        logger.info(f"Regenerando seção {section} da análise")
+        resume_block = self._resume_block(resume_text, chunked)
+        
+        if analysis is not None:
+            # A análise atual (monolítica ou por seções) preenche as demais; só a seção pedida vai ao Gemini
+            analysis = Analysis.from_dict(analysis).to_dict()
+            for name, spec in ANALYSIS_SECTIONS.items():
+                if name != section and all(analysis.get(k) is not None for k in spec["chaves"]):
+                    self.cache.set(cache_key("analysis_section", SECTION_PROMPT_VERSION, name, resume_block),
+                                   {k: analysis[k] for k in spec["chaves"]})
+            result = dict(analysis)
+            result.update(self._analyze_section(section, resume_block, refresh=True))
+            result = Analysis.from_dict(result).to_dict()
+        else:
+            # Sem a análise atual, as demais seções saem do cache (ou são geradas se não estiverem lá)
+            result = self._analyze_sectioned(resume_block, refresh={section})
+        if self.dedup_index is not None:
+            self.dedup_index.add(resume_text, result)
+        return result
+    
+    def _remember_revision(self, user_id: str, resume_text: str, analysis: Dict[str, Any]):
+        # Payloads separados: a análise idêntica à guardada pela interface ocupa espaço uma única vez
+        self.session_store.save(user_id, "revisao_texto", resume_text)
+        self.session_store.save(user_id, "revisao_analise", analysis)
+    
+    def _has_revision(self, user_id: str) -> bool:
+        return self.session_store.touch(user_id, ("revisao_texto", "revisao_analise"))
+    
+    def _analyze_incremental(self, user_id: str, resume_text: str) -> Dict[str, Any]:
+        if not self._has_revision(user_id):
+            return None
+        previous = {"texto": self.session_store.load(user_id, "revisao_texto"),
+                    "analise": self.session_store.load(user_id, "revisao_analise")}
+        if previous["texto"] is None or previous["analise"] is None:
+            return None
+        
+        changes = diff_sections(previous["texto"], resume_text)
+        if not changes:
+            logger.info("Currículo sem alterações de conteúdo. Reutilizando análise anterior")
+            return previous["analise"]
+        ratio = change_ratio(changes, previous["texto"], resume_text)
+        if ratio > self.incremental_max_change:
+            logger.info(f"Alteração em {ratio:.0%} do currículo. Refazendo a análise completa")
+            return None
+        
+        logger.info(f"Reanálise incremental: {len(changes)} seção(ões) alterada(s), {ratio:.0%} do texto")
+        blocks = []
+        for change in changes:
+            # Só os trechos alterados vão no prompt, não a seção inteira
+            for before, after in change_hunks(change):
+                blocks.append(f"### Seção: {change.name}\nANTES:\n{before or '(não existia)'}\n"
+                              f"DEPOIS:\n{after or '(removido)'}")
+        changed = "\n\n".join(blocks)
+        
+        prompt = f"""O profissional revisou o currículo já analisado. Atualize a análise de carreira considerando apenas as alterações abaixo.
+
+ANÁLISE ANTERIOR:
+{json.dumps(previous["analise"], ensure_ascii=False)}
+
+TRECHOS ALTERADOS DO CURRÍCULO:
+{changed}
+
+Retorne APENAS JSON (sem markdown) contendo somente as chaves de primeiro nível que precisam mudar por causa das alterações ({', '.join(ANALYSIS_KEYS)}), cada uma completa e no mesmo formato da análise anterior. Se nada precisar mudar (ex: correção de digitação), retorne {{}}."""
+        
+        result_text = self._generate("update_analysis", prompt, temperature=0.3, max_output_tokens=8192, timeout=90)
         try:
-            resume_text = self._sanitize_input(resume_text)
+            update = self._parse_json_response(result_text)
+        except json.JSONDecodeError:
+            logger.warning("Resposta incremental inválida. Refazendo a análise completa")
+            return None
+        if not isinstance(update, dict):
+            return None
+        
+        result = dict(previous["analise"])
+        result.update({key: value for key, value in update.items() if key in ANALYSIS_KEYS})
+        logger.info(f"Chaves atualizadas: {', '.join(k for k in update if k in ANALYSIS_KEYS) or 'nenhuma'}")
+        return Analysis.from_dict(result).to_dict()
+    
+    def analyze_resume(self, resume_text: str, chunked: bool = None, sectioned: bool = None,
+                       user_id: str = None) -> Dict[str, Any]:
+        self._record_operation("analyze_resume", resume_text=resume_text, chunked=chunked,
+                               sectioned=sectioned, user_id=user_id)
+        if chunked is None:
+            chunked = isinstance(resume_text, str) and len(resume_text) > MAX_RESUME_CHARS
+        if sectioned is None:
+            sectioned = self.sectioned
+        
+        try:
+            resume_text = self._sanitize_input(resume_text, MAX_DOCUMENT_CHARS if chunked else MAX_RESUME_CHARS)
         except ValueError as e:
             logger.error(f"Erro na validação de entrada: {e}")
             raise
         
         logger.info(f"Analisando currículo: {len(resume_text)} caracteres")
-        logger.info("Iniciando análise de currículo...")
+        
+        # Com uma versão anterior do mesmo usuário, a reanálise incremental tem prioridade: uma pequena
+        # revisão é quase idêntica à anterior e o índice de duplicatas devolveria a análise desatualizada
+        incremental = user_id is not None and not chunked and self._has_revision(user_id)
+        if self.dedup_index is not None and not incremental:
+            match = self.dedup_index.query(resume_text, threshold=self.dedup_threshold)
+            if match is not None:
+                logger.info(f"Currículo {'idêntico' if match.exact else 'quase idêntico'} já analisado "
+                            f"(similaridade: {match.similarity:.2f}). Reutilizando análise #{match.entry_id}")
+                if user_id is not None:
+                    self._remember_revision(user_id, resume_text, match.analysis)
+                return match.analysis
+        
+        logger.info(f"Iniciando análise de currículo{' em trechos' if chunked else ''}"
+                    f"{' por seções' if sectioned else ''}...")
         print("🔍 Analisando currículo...")
         
-        prompt = f"""Analise este currículo profissionalmente e retorne um JSON estruturado.
+        try:
+            result = None
+            if incremental:
+                # Revisão de um currículo já analisado: só as seções alteradas vão ao Gemini
+                result = self._analyze_incremental(user_id, resume_text)
+            if result is None and sectioned:
+                result = self._analyze_sectioned(self._resume_block(resume_text, chunked))
+            elif result is None:
+                resume_block = self._resume_block(resume_text, chunked)
+                prompt = f"""Analise este currículo profissionalmente e retorne um JSON estruturado.
 
 Identifique:
 - Profissão real baseada em experiências e responsabilidades
@@ -115,92 +664,17 @@ Identifique:
 - Próximo cargo lógico na carreira
 - Plano de desenvolvimento profissional
 
-CURRÍCULO:
-{resume_text}
+{resume_block}
 
 Retorne APENAS JSON (sem markdown):
-{{
-    "profissao_real": {{"titulo": "título claro", "descricao": "descrição prática", "nivel_confianca": "alto/médio/baixo"}},
-    "nivel_senioridade": {{"nivel": "Júnior/Pleno/Sênior/Especialista", "anos_experiencia": número, "justificativa": "análise detalhada"}},
-    "lacunas": {{
-        "tecnicas": [{{"skill": "skill específica", "importancia": "alta/média/baixa", "como_desenvolver": "ação prática"}}],
-        "comportamentais": [{{"competencia": "competência clara", "importancia": "alta/média/baixa", "como_desenvolver": "conselho prático"}}]
-    }},
-    "proximo_cargo": {{"cargo": "título realista", "prazo_estimado": "timeframe", "requisitos": ["item claro"], "probabilidade": "alta/média/baixa"}},
-    "plano_crescimento": {{
-        "objetivo": "objetivo inspirador mas alcançável",
-        "prazo_total": "prazo realista",
-        "etapas": [{{"numero": 1, "titulo": "fase clara", "prazo": "tempo", "acoes": ["ação específica"], "recursos": ["recurso útil"], "indicadores_sucesso": ["métrica clara"]}}],
-        "certificacoes_sugeridas": ["certificação relevante"],
-        "cursos_recomendados": ["curso específico"]
-    }}
-}}"""
-        
-        try:
-            payload = {
-                "contents": [{
-                    "parts": [{"text": prompt}]
-                }],
-                "generationConfig": {
-                    "temperature": 0.7,
-                    "maxOutputTokens": 8192
-                }
-            }
-            
-            headers = {"Content-Type": "application/json"}
-            response = requests.post(
-                f"{self.api_url}?key={self.api_key}",
-                headers=headers,
-                json=payload,
-                timeout=120
-            )
-            
-            if response.status_code == 429:
-                logger.warning("Rate limit atingido. Tentando modelos alternativos...")
-                print("⚠️ Limite de requisições atingido. Tentando modelo alternativo...")
-                
-                fallback_models = [
-                    "gemini-1.5-flash-latest",
-                    "gemini-1.5-pro-latest",
-                    "gemini-pro"
-                ]
-                
-                for model in fallback_models:
-                    try:
-                        fallback_url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
-                        response = requests.post(
-                            f"{fallback_url}?key={self.api_key}",
-                            headers=headers,
-                            json=payload,
-                            timeout=120
-                        )
-                        
-                        if response.status_code == 200:
-                            logger.info(f"Sucesso com modelo: {model}")
-                            break
-                    except:
-                        continue
-                
-                if response.status_code != 200:
-                    logger.error(f"Todos os modelos falharam. Status: {response.status_code}")
-                    raise ValueError(f"Limite diário atingido. Aguarde algumas horas ou use outra API key.")
-            
-            elif response.status_code != 200:
-                logger.error(f"Erro API: {response.status_code} - {response.text}")
-                raise ValueError(f"Erro na API Gemini: {response.status_code}")
-            
-            result_data = response.json()
-            result_text = result_data['candidates'][0]['content']['parts'][0]['text']
-            
-            # Limpar markdown e espaços
-            result_text = result_text.strip()
-            if result_text.startswith('```'):
-                lines = result_text.split('\n')
-                result_text = '\n'.join(lines[1:-1]) if len(lines) > 2 else result_text
-            result_text = result_text.replace('```json', '').replace('```', '').strip()
-            
-            result = json.loads(result_text)
+{ANALYSIS_JSON_FORMAT}"""
+                result_text = self._generate("analyze_resume", prompt, temperature=0.7, max_output_tokens=8192, timeout=120)
+                result = Analysis.from_dict(self._parse_json_response(result_text)).to_dict()
             logger.info("Análise concluída com sucesso")
+            if self.dedup_index is not None:
+                self.dedup_index.add(resume_text, result)
+            if user_id is not None:
+                self._remember_revision(user_id, resume_text, result)
             print("✅ Análise completa!")
             return result
             
@@ -233,78 +707,277 @@ Retorne APENAS JSON (sem markdown):
         result = self.analyze_resume(resume_text)
         return result.get('plano_crescimento', {})
     
+    def _roadmap_context(self, resume_text: str) -> str:
+        resume_text = self._sanitize_input(resume_text, MAX_DOCUMENT_CHARS)
+        if len(resume_text) > ROADMAP_CONTEXT_CHARS:
+            # Currículos longos entram como fatos extraídos em vez de truncados. Acima de MAX_RESUME_CHARS os fatos
+            # já estão em cache pela análise em trechos; entre os dois limites o primeiro roadmap faz a extração
+            return json.dumps(self._extract_facts(resume_text), ensure_ascii=False)
+        return resume_text
+    
+    def generate_career_roadmap(self, resume_text: str, career_goal: str) -> Dict[str, Any]:
+        self._record_operation("generate_career_roadmap", resume_text=resume_text, career_goal=career_goal)
+        if not career_goal or not isinstance(career_goal, str):
+            raise ValueError("Objetivo de carreira inválido.")
+        
+        logger.info(f"Gerando roadmap para objetivo: {career_goal}")
+        return self._roadmap_for_goal(self._roadmap_context(resume_text), career_goal)
+    
+    def iter_career_roadmaps(self, resume_text: str,
+                             career_goals: List[str]) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]]:
+        # Gravada como compare_career_roadmaps, que consome este gerador por completo
+        self._record_operation("compare_career_roadmaps", resume_text=resume_text, career_goals=list(career_goals))
+        goals = list(dict.fromkeys(g.strip() for g in career_goals if isinstance(g, str) and g.strip()))
+        if not goals:
+            raise ValueError("Informe ao menos um objetivo de carreira.")
+        if len(goals) > MAX_COMPARE_GOALS:
+            raise ValueError(f"Compare no máximo {MAX_COMPARE_GOALS} objetivos por vez.")
+        
+        logger.info(f"Gerando {len(goals)} roadmaps em paralelo: {', '.join(goals)}")
+        # O contexto do currículo é preparado uma vez e compartilhado por todos os objetivos
+        resume_context = self._roadmap_context(resume_text)
+        with ThreadPoolExecutor(max_workers=len(goals)) as executor:
+            futures = {submit_in_context(executor, self._roadmap_for_goal, resume_context, goal): goal for goal in goals}
+            for future in as_completed(futures):
+                goal = futures[future]
+                try:
+                    yield goal, future.result(), None
+                except Exception as e:
+                    logger.error(f"Erro no roadmap de {goal}: {type(e).__name__} - {e}")
+                    yield goal, None, e
+    
+    def compare_career_roadmaps(self, resume_text: str, career_goals: List[str]) -> Dict[str, Any]:
+        roadmaps, errors = {}, {}
+        for goal, roadmap, error in self.iter_career_roadmaps(resume_text, career_goals):
+            if error is not None:
+                errors[goal] = error
+            else:
+                roadmaps[goal] = roadmap
+        if not roadmaps and errors:
+            raise next(iter(errors.values()))
+        return {"roadmaps": roadmaps, "erros": {goal: str(e) for goal, e in errors.items()}}
+    
+    def _roadmap_for_goal(self, resume_context: str, career_goal: str) -> Dict[str, Any]:
+        prompt = f"""Você é um consultor executivo de carreira altamente experiente, especializado em transições profissionais estratégicas e desenvolvimento de liderança.
+
+ANÁLISE SOLICITADA:
+Avalie a viabilidade de transição do perfil profissional abaixo para o objetivo de carreira definido. Crie um roadmap estratégico, realista e acionável.
+
+CURRÍCULO DO PROFISSIONAL:
+{resume_context}
+
+OBJETIVO DE CARREIRA DESEJADO: {career_goal}
+
+DIRETRIZES PARA ANÁLISE PROFISSIONAL:
+1. Seja honesto sobre a viabilidade do objetivo considerando o perfil atual
+2. Defina prazos realistas baseados em transições de mercado
+3. Priorize ações de alto impacto que acelerem a transição
+4. Sugira certificações e cursos reconhecidos pelo mercado
+5. Inclua desenvolvimento de soft skills críticas para o cargo alvo
+6. Considere networking estratégico e visibilidade profissional
+7. Identifique possíveis cargos intermediários se necessário
+
+Retorne APENAS JSON válido (sem markdown, sem comentários):
+{{
+    "objetivo_viavel": true,
+    "prazo_estimado": "18-24 meses",
+    "nivel_desafio": "médio",
+    "etapas": [
+        {{
+            "ordem": 1,
+            "titulo": "Fundação Técnica e Posicionamento",
+            "prazo": "4-6 meses",
+            "acoes": [
+                "Completar certificação X reconhecida no mercado",
+                "Desenvolver projeto demonstrativo em Y",
+                "Iniciar networking estratégico com profissionais da área"
+            ],
+            "skills_desenvolver": [
+                "Skill técnica específica 1",
+                "Skill técnica específica 2", 
+                "Soft skill relevante"
+            ],
+            "recursos": [
+                "Certificação profissional reconhecida (ex: AWS, Azure, PMP)",
+                "Curso estruturado de plataforma respeitada",
+                "Comunidade ou grupo profissional específico"
+            ],
+            "indicadores_sucesso": [
+                "Certificação obtida",
+                "Portfolio com 3+ projetos relevantes",
+                "Rede de 50+ conexões estratégicas"
+            ]
+        }}
+    ],
+    "cargos_intermediarios": ["Cargo de transição 1", "Cargo de transição 2"],
+    "investimento_estimado": "R$ X.XXX - investimento em cursos, certificações e networking",
+    "probabilidade_sucesso": "alta",
+    "fatores_criticos": [
+        "Dedicação de X horas semanais para desenvolvimento",
+        "Investimento em certificações chave",
+        "Networking ativo e consistente"
+    ],
+    "observacoes": "Análise estratégica considerando tendências de mercado, demanda por perfil e competitividade. Inclua insights sobre o momento ideal para transição e possíveis desafios."
+}}"""
+
+        logger.info("Fazendo requisição para API do Gemini...")
+        text = self._generate("roadmap", prompt, temperature=0.7, max_output_tokens=8192, timeout=120)
+        logger.info(f"Texto recebido (primeiros 200 chars): {text[:200]}")
+        
+        try:
+            roadmap_data = Roadmap.from_dict(self._parse_json_response(text)).to_dict()
+            logger.info("JSON parseado com sucesso")
+            return roadmap_data
+        except json.JSONDecodeError as json_error:
+            logger.error(f"Erro ao decodificar JSON do roadmap: {json_error}")
+            logger.error(f"Texto completo que causou erro: {text}")
+            raise ValueError("Erro ao processar resposta da API. A resposta pode ter sido truncada. "
+                             "Tente um objetivo mais simples ou específico.")
+    
+    def assess_fit(self, resume_text: str, job_description: str) -> Dict[str, Any]:
+        self._record_operation("assess_fit", resume_text=resume_text, job_description=job_description)
+        resume_text = self._sanitize_input(resume_text)
+        job_description = self._sanitize_input(job_description, MAX_JOB_DESCRIPTION_CHARS)
+        key = cache_key("fit", FIT_PROMPT_VERSION, job_description, resume_text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        prompt = f"""Você é um recrutador técnico experiente. Avalie a aderência do candidato à vaga com base apenas em evidências do currículo.
+
+VAGA:
+{job_description}
+
+CURRÍCULO:
+{resume_text}
+
+Retorne APENAS JSON (sem markdown):
+{FIT_JSON_FORMAT}"""
+        text = self._generate("assess_fit", prompt, temperature=0.2, max_output_tokens=2048, timeout=60)
+        try:
+            result = self._parse_json_response(text)
+        except json.JSONDecodeError:
+            raise ValueError("Erro ao processar avaliação de aderência. Tente novamente.")
+        result["aderencia"] = coerce_number(result.get("aderencia"))
+        self.cache.set(key, result)
+        return result
+    
+    def rank_candidates(self, job_description: str, index=None, top_k: int = 10,
+                        assess: bool = True) -> List[Dict[str, Any]]:
+        if index is None:
+            from resume_ranker import get_default_ranking_index
+            index = get_default_ranking_index()
+        if index is None:
+            raise ValueError("Índice de ranqueamento não configurado. Defina CVISION_RANKING_INDEX.")
+        job_description = self._sanitize_input(job_description, MAX_JOB_DESCRIPTION_CHARS)
+        
+        # Pré-ranqueamento local de todo o conjunto; só o top-K vai ao Gemini
+        shortlist = index.rank(job_description, top_k=top_k)
+        logger.info(f"Pré-ranqueamento local: {len(index)} currículos, {len(shortlist)} selecionados")
+        results = [{
+            "id": candidate.external_id,
+            "posicao_local": position,
+            "score_local": candidate.score,
+            "bm25": candidate.bm25,
+            "cobertura_skills": candidate.skill_coverage,
+            "skills_encontradas": candidate.matched_skills,
+            "skills_faltantes": candidate.missing_skills,
+        } for position, candidate in enumerate(shortlist, 1)]
+        if not assess or not results:
+            return results
+        
+        def evaluate(result):
+            try:
+                result["avaliacao"] = self.assess_fit(index.text(result["id"]), job_description)
+            except Exception as e:
+                logger.error(f"Erro ao avaliar {result['id']}: {type(e).__name__} - {e}")
+                result["erro"] = str(e)
+            return result
+        
+        with ThreadPoolExecutor(max_workers=min(self.map_workers, len(results))) as executor:
+            results = [f.result() for f in [submit_in_context(executor, evaluate, r) for r in results]]
+        # Ordena pela aderência do Gemini; candidatos sem avaliação mantêm a ordem local no fim
+        # aderencia 0 é uma avaliação válida e fica à frente dos candidatos sem avaliação
+        def adherence(result):
+            value = result.get("avaliacao", {}).get("aderencia")
+            return -1 if value is None else value
+        results.sort(key=lambda r: -adherence(r))
+        return results
+    
     def generate_report(self, analysis: Dict[str, Any]) -> str:
+        if not isinstance(analysis, Analysis):
+            analysis = Analysis.from_dict(analysis)
         report = []
         report.append("=" * 80)
         report.append("📊 RELATÓRIO DE INTELIGÊNCIA DE CARREIRA")
         report.append("=" * 80)
         report.append("")
         
-        if 'profissao_real' in analysis:
-            prof = analysis['profissao_real']
+        if analysis.profissao_real is not None:
+            prof = analysis.profissao_real
             report.append("🎯 1. PROFISSÃO REAL IDENTIFICADA")
-            report.append(f"   Título: {prof.get('titulo', 'N/A')}")
-            report.append(f"   Descrição: {prof.get('descricao', 'N/A')}")
-            report.append(f"   Confiança: {prof.get('nivel_confianca', 'N/A')}")
+            report.append(f"   Título: {prof.titulo or 'N/A'}")
+            report.append(f"   Descrição: {prof.descricao or 'N/A'}")
+            report.append(f"   Confiança: {prof.nivel_confianca or 'N/A'}")
             report.append("")
         
-        if 'nivel_senioridade' in analysis:
-            sen = analysis['nivel_senioridade']
+        if analysis.nivel_senioridade is not None:
+            sen = analysis.nivel_senioridade
             report.append("📈 2. NÍVEL DE SENIORIDADE")
-            report.append(f"   Nível: {sen.get('nivel', 'N/A')}")
-            report.append(f"   Anos de experiência: {sen.get('anos_experiencia', 'N/A')}")
-            report.append(f"   Justificativa: {sen.get('justificativa', 'N/A')}")
+            report.append(f"   Nível: {sen.nivel or 'N/A'}")
+            report.append(f"   Anos de experiência: {'N/A' if sen.anos_experiencia is None else sen.anos_experiencia}")
+            report.append(f"   Justificativa: {sen.justificativa or 'N/A'}")
             report.append("")
         
-        if 'lacunas' in analysis:
-            lacunas = analysis['lacunas']
+        if analysis.lacunas is not None:
+            lacunas = analysis.lacunas
             report.append("🔍 3. LACUNAS IDENTIFICADAS")
             report.append("")
             report.append("   Lacunas Técnicas:")
-            for gap in lacunas.get('tecnicas', []):
-                report.append(f"   • {gap.get('skill', 'N/A')} (Importância: {gap.get('importancia', 'N/A')})")
-                report.append(f"     Como desenvolver: {gap.get('como_desenvolver', 'N/A')}")
+            for gap in lacunas.tecnicas:
+                report.append(f"   • {gap.skill or 'N/A'} (Importância: {gap.importancia})")
+                report.append(f"     Como desenvolver: {gap.como_desenvolver or 'N/A'}")
             report.append("")
             report.append("   Lacunas Comportamentais:")
-            for gap in lacunas.get('comportamentais', []):
-                report.append(f"   • {gap.get('competencia', 'N/A')} (Importância: {gap.get('importancia', 'N/A')})")
-                report.append(f"     Como desenvolver: {gap.get('como_desenvolver', 'N/A')}")
+            for gap in lacunas.comportamentais:
+                report.append(f"   • {gap.competencia or 'N/A'} (Importância: {gap.importancia})")
+                report.append(f"     Como desenvolver: {gap.como_desenvolver or 'N/A'}")
             report.append("")
         
-        if 'proximo_cargo' in analysis:
-            prox = analysis['proximo_cargo']
+        if analysis.proximo_cargo is not None:
+            prox = analysis.proximo_cargo
             report.append("🚀 4. PRÓXIMO CARGO PROVÁVEL")
-            report.append(f"   Cargo: {prox.get('cargo', 'N/A')}")
-            report.append(f"   Prazo estimado: {prox.get('prazo_estimado', 'N/A')}")
-            report.append(f"   Probabilidade: {prox.get('probabilidade', 'N/A')}")
+            report.append(f"   Cargo: {prox.cargo or 'N/A'}")
+            report.append(f"   Prazo estimado: {prox.prazo_estimado or 'N/A'}")
+            report.append(f"   Probabilidade: {prox.probabilidade or 'N/A'}")
             report.append("   Requisitos:")
-            for req in prox.get('requisitos', []):
+            for req in prox.requisitos:
                 report.append(f"   • {req}")
             report.append("")
         
-        if 'plano_crescimento' in analysis:
-            plano = analysis['plano_crescimento']
+        if analysis.plano_crescimento is not None:
+            plano = analysis.plano_crescimento
             report.append("📋 5. PLANO PRÁTICO DE CRESCIMENTO")
-            report.append(f"   Objetivo: {plano.get('objetivo', 'N/A')}")
-            report.append(f"   Prazo total: {plano.get('prazo_total', 'N/A')}")
+            report.append(f"   Objetivo: {plano.objetivo or 'N/A'}")
+            report.append(f"   Prazo total: {plano.prazo_total or 'N/A'}")
             report.append("")
             report.append("   Etapas:")
-            for etapa in plano.get('etapas', []):
-                report.append(f"   Etapa {etapa.get('numero', 'N/A')}: {etapa.get('titulo', 'N/A')} ({etapa.get('prazo', 'N/A')})")
+            for etapa in plano.etapas:
+                report.append(f"   Etapa {etapa.numero or 'N/A'}: {etapa.titulo or 'N/A'} ({etapa.prazo or 'N/A'})")
                 report.append("   Ações:")
-                for acao in etapa.get('acoes', []):
+                for acao in etapa.acoes:
                     report.append(f"     • {acao}")
                 report.append("")
             
-            if plano.get('certificacoes_sugeridas'):
+            if plano.certificacoes_sugeridas:
                 report.append("   Certificações Sugeridas:")
-                for cert in plano['certificacoes_sugeridas']:
+                for cert in plano.certificacoes_sugeridas:
                     report.append(f"   • {cert}")
                 report.append("")
             
-            if plano.get('cursos_recomendados'):
+            if plano.cursos_recomendados:
                 report.append("   Cursos Recomendados:")
-                for curso in plano['cursos_recomendados']:
+                for curso in plano.cursos_recomendados:
                     report.append(f"   • {curso}")
         
         report.append("")
@@ -312,8 +985,8 @@ Retorne APENAS JSON (sem markdown):
         
         return "\n".join(report)
 
-
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     print("Career Intelligence AI Agent")
     print("=" * 50)
     
@@ -0,0 +1,278 @@
+import re
+import json
+import zlib
+from typing import Dict, Any, List, Optional, Callable, Iterable, Iterator, Tuple, Type
+
+NIVEIS_SENIORIDADE = ['Júnior', 'Pleno', 'Sênior', 'Especialista']
+
+_SENIORIDADE_ALIASES = {
+    'junior': 'Júnior', 'júnior': 'Júnior', 'jr': 'Júnior', 'estagiario': 'Júnior', 'estagiário': 'Júnior',
+    'pleno': 'Pleno', 'mid': 'Pleno', 'mid-level': 'Pleno',
+    'senior': 'Sênior', 'sênior': 'Sênior', 'sr': 'Sênior',
+    'especialista': 'Especialista', 'staff': 'Especialista', 'principal': 'Especialista',
+}
+
+# Escalas usadas pelo modelo nos dois gêneros ("alta/média/baixa" e "alto/médio/baixo")
+_ESCALA = {
+    'alta': 0, 'alto': 0, 'high': 0, 'critica': 0, 'crítica': 0, 'elevada': 0,
+    'media': 1, 'média': 1, 'medio': 1, 'médio': 1, 'medium': 1, 'moderada': 1, 'moderado': 1,
+    'baixa': 2, 'baixo': 2, 'low': 2,
+}
+ESCALA_FEMININA = ('alta', 'média', 'baixa')
+ESCALA_MASCULINA = ('alto', 'médio', 'baixo')
+
+_VERDADEIRO = {'true', 'sim', 'yes', 'viavel', 'viável', '1'}
+
+
+def normalize_seniority(value: Any) -> Optional[str]:
+    if not value or not isinstance(value, str):
+        return None
+    key = value.strip().lower()
+    if key in _SENIORIDADE_ALIASES:
+        return _SENIORIDADE_ALIASES[key]
+    # "Pleno/Sênior" e similares: usa o primeiro nível reconhecido
+    for token in re.split(r'[\s/,-]+', key):
+        if token in _SENIORIDADE_ALIASES:
+            return _SENIORIDADE_ALIASES[token]
+    return value.strip()
+
+
+def coerce_number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number = value
+    elif isinstance(value, str):
+        match = re.search(r'\d+(?:[.,]\d+)?', value)
+        if not match:
+            return None
+        number = float(match.group().replace(',', '.'))
+    else:
+        return None
+    return int(number) if float(number).is_integer() else float(number)
+
+
+def _text(value: Any) -> str:
+    if value is None or isinstance(value, (dict, list)):
+        return ''
+    return str(value).strip()
+
+
+def _integer(value: Any) -> Optional[int]:
+    number = coerce_number(value)
+    return int(number) if number is not None else None
+
+
+def _boolean(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in _VERDADEIRO
+    return bool(value) if value is not None else True
+
+
+def _text_list(value: Any) -> List[str]:
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        return []
+    return [text for text in (_text(item) for item in value) if text]
+
+
+def _scale(labels: Tuple[str, str, str], default: str = None) -> Callable[[Any], Optional[str]]:
+    def coerce(value: Any) -> Optional[str]:
+        if isinstance(value, str):
+            key = value.strip().lower()
+            if key not in _ESCALA:
+                key = re.split(r'[\s/,-]+', key)[0]
+            if key in _ESCALA:
+                return labels[_ESCALA[key]]
+        return default
+    return coerce
+
+
+def _model(cls: Type['_Model']) -> Callable[[Any], Optional['_Model']]:
+    def coerce(value: Any):
+        return value if isinstance(value, cls) else cls.from_dict(value) if isinstance(value, dict) else None
+    return coerce
+
+
+def _model_list(cls: Type['_Model']) -> Callable[[Any], List['_Model']]:
+    def coerce(value: Any):
+        if not isinstance(value, list):
+            return []
+        items = []
+        for item in value:
+            if isinstance(item, str) and item.strip():
+                # Lista de textos no lugar de objetos: o texto vira o primeiro campo
+                item = {cls._schema[0][0]: item}
+            if isinstance(item, (cls, dict)):
+                items.append(item if isinstance(item, cls) else cls.from_dict(item))
+        return items
+    return coerce
+
+
+def _slots(schema: Tuple[Tuple[str, Callable], ...]) -> Tuple[str, ...]:
+    return tuple(name for name, _ in schema)
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, _Model):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_dump(item) for item in value]
+    return value
+
+
+class _Model:
+    __slots__ = ()
+    _schema: Tuple[Tuple[str, Callable[[Any], Any]], ...] = ()
+    _omit_none = False
+
+    def __init__(self, **fields):
+        # Validação e coerção em uma única passada pelos campos do esquema
+        for name, coerce in self._schema:
+            setattr(self, name, coerce(fields.get(name)))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        return cls(**data) if isinstance(data, dict) else cls()
+
+    @classmethod
+    def from_json(cls, text: str):
+        return cls.from_dict(json.loads(text))
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if value is not None or not self._omit_none:
+                result[name] = _dump(value)
+        return result
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(',', ':'))
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(getattr(self, n) == getattr(other, n) for n in self.__slots__)
+
+    def __repr__(self):
+        fields = ', '.join(f"{n}={getattr(self, n)!r}" for n in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class Profession(_Model):
+    _schema = (("titulo", _text), ("descricao", _text),
+               ("nivel_confianca", _scale(ESCALA_MASCULINA)))
+    __slots__ = _slots(_schema)
+
+
+class Seniority(_Model):
+    _schema = (("nivel", normalize_seniority), ("anos_experiencia", coerce_number),
+               ("justificativa", _text))
+    __slots__ = _slots(_schema)
+
+
+class TechnicalGap(_Model):
+    _schema = (("skill", _text), ("importancia", _scale(ESCALA_FEMININA, 'média')),
+               ("como_desenvolver", _text))
+    __slots__ = _slots(_schema)
+
+
+class BehavioralGap(_Model):
+    _schema = (("competencia", _text), ("importancia", _scale(ESCALA_FEMININA, 'média')),
+               ("como_desenvolver", _text))
+    __slots__ = _slots(_schema)
+
+
+class Gaps(_Model):
+    _schema = (("tecnicas", _model_list(TechnicalGap)), ("comportamentais", _model_list(BehavioralGap)))
+    __slots__ = _slots(_schema)
+
+    def __len__(self):
+        return len(self.tecnicas) + len(self.comportamentais)
+
+
+class NextRole(_Model):
+    _schema = (("cargo", _text), ("prazo_estimado", _text), ("requisitos", _text_list),
+               ("probabilidade", _scale(ESCALA_FEMININA)))
+    __slots__ = _slots(_schema)
+
+
+class GrowthStep(_Model):
+    _schema = (("numero", _integer), ("titulo", _text), ("prazo", _text), ("acoes", _text_list),
+               ("recursos", _text_list), ("indicadores_sucesso", _text_list))
+    __slots__ = _slots(_schema)
+
+
+class GrowthPlan(_Model):
+    _schema = (("objetivo", _text), ("prazo_total", _text), ("etapas", _model_list(GrowthStep)),
+               ("certificacoes_sugeridas", _text_list), ("cursos_recomendados", _text_list))
+    __slots__ = _slots(_schema)
+
+
+class Analysis(_Model):
+    # Seções ausentes ficam None e são omitidas em to_dict, como no JSON original
+    _schema = (("profissao_real", _model(Profession)), ("nivel_senioridade", _model(Seniority)),
+               ("lacunas", _model(Gaps)), ("proximo_cargo", _model(NextRole)),
+               ("plano_crescimento", _model(GrowthPlan)))
+    __slots__ = _slots(_schema)
+    _omit_none = True
+
+
+class RoadmapStep(_Model):
+    _schema = (("ordem", _integer), ("titulo", _text), ("prazo", _text), ("acoes", _text_list),
+               ("skills_desenvolver", _text_list), ("recursos", _text_list),
+               ("indicadores_sucesso", _text_list))
+    __slots__ = _slots(_schema)
+
+
+class Roadmap(_Model):
+    _schema = (("objetivo_viavel", _boolean), ("prazo_estimado", _text),
+               ("nivel_desafio", _scale(ESCALA_MASCULINA, 'médio')), ("etapas", _model_list(RoadmapStep)),
+               ("cargos_intermediarios", _text_list), ("investimento_estimado", _text),
+               ("probabilidade_sucesso", _scale(ESCALA_FEMININA, 'média')), ("fatores_criticos", _text_list),
+               ("observacoes", _text))
+    __slots__ = _slots(_schema)
+
+
+# Lista de modelos guardados como JSON compacto (opcionalmente zlib), materializados no acesso
+class PackedList:
+    __slots__ = ("model", "compress", "_items", "nbytes")
+
+    def __init__(self, model: Type[_Model], items: Iterable = (), compress: bool = False):
+        self.model = model
+        self.compress = compress
+        self._items: List[bytes] = []
+        self.nbytes = 0
+        self.extend(items)
+
+    def append(self, item):
+        if isinstance(item, dict):
+            item = self.model.from_dict(item)
+        data = item.to_json().encode('utf-8')
+        if self.compress:
+            data = zlib.compress(data, 6)
+        self._items.append(data)
+        self.nbytes += len(data)
+
+    def extend(self, items: Iterable):
+        for item in items:
+            self.append(item)
+
+    def _unpack(self, data: bytes) -> _Model:
+        if self.compress:
+            data = zlib.decompress(data)
+        return self.model.from_dict(json.loads(data))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index: int) -> _Model:
+        return self._unpack(self._items[index])
+
+    def __iter__(self) -> Iterator[_Model]:
+        for data in self._items:
+            yield self._unpack(data)
+
+    def to_json_lines(self) -> Iterator[str]:
+        for data in self._items:
+            yield (zlib.decompress(data) if self.compress else data).decode('utf-8')
@@ -0,0 +1,178 @@
+import os
+import re
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+import logging
+import unicodedata
+from typing import Dict, Any, List, Optional, NamedTuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_MAX_HASH = np.uint32(0xFFFFFFFF)
+_SHIFT = np.uint64(32)
+
+
+class DuplicateMatch(NamedTuple):
+    entry_id: int
+    similarity: float
+    exact: bool
+    analysis: Dict[str, Any]
+
+
+def normalize_text(text: str) -> str:
+    text = unicodedata.normalize('NFKD', text.lower()).encode('ascii', 'ignore').decode('ascii')
+    # Telefones, datas e números variam entre versões do mesmo currículo
+    text = re.sub(r'\d+', '0', text)
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def shingles(normalized: str, size: int = 3) -> List[str]:
+    words = normalized.split()
+    if len(words) <= size:
+        return [' '.join(words)] if words else []
+    return [' '.join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big', signed=True)
+
+
+class MinHashLSHIndex:
+
+    def __init__(self, path: str = None, num_perm: int = 128, bands: int = 16,
+                 shingle_size: int = 3, seed: int = 1):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm deve ser múltiplo de bands.")
+
+        self.path = path or os.getenv('CVISION_DEDUP_INDEX', os.path.join('data', 'dedup.sqlite'))
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        # Hash multiply-shift: (a*x + b) mod 2^64, bits altos; a ímpar
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(0, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64) | np.uint64(1)
+        self._b = rng.randint(0, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY,
+                content_hash TEXT UNIQUE NOT NULL,
+                signature BLOB NOT NULL,
+                analysis TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS buckets (
+                bucket INTEGER NOT NULL,
+                entry_id INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_buckets ON buckets(bucket);
+        """)
+        self._check_params()
+
+    def _check_params(self):
+        params = json.dumps({"num_perm": self.num_perm, "bands": self.bands,
+                             "shingle_size": self.shingle_size})
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'params'").fetchone()
+            if row is None:
+                self._conn.execute("INSERT INTO meta (key, value) VALUES ('params', ?)", (params,))
+            elif row[0] != params:
+                raise ValueError(f"Índice em {self.path} foi criado com parâmetros diferentes: {row[0]}")
+
+    def signature(self, text: str, normalized: bool = False) -> np.ndarray:
+        items = shingles(text if normalized else normalize_text(text), self.shingle_size)
+        if not items:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode('utf-8')) for s in set(items)),
+            dtype=np.uint64
+        )
+        with np.errstate(over='ignore'):
+            permuted = (np.outer(hashes, self._a) + self._b) >> _SHIFT
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _bucket_keys(self, signature: np.ndarray) -> List[int]:
+        bands = signature.reshape(self.bands, self.rows)
+        return [_hash64(i.to_bytes(2, 'big') + band.tobytes()) for i, band in enumerate(bands)]
+
+    @staticmethod
+    def _content_hash(normalized: str) -> str:
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    def add(self, text: str, analysis: Dict[str, Any]) -> int:
+        normalized = normalize_text(text)
+        content_hash = self._content_hash(normalized)
+        signature = self.signature(normalized, normalized=True)
+        payload = json.dumps(analysis, ensure_ascii=False)
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT id FROM entries WHERE content_hash = ?", (content_hash,)).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE entries SET analysis = ?, created_at = ? WHERE id = ?",
+                                   (payload, time.time(), row[0]))
+                return row[0]
+            cursor = self._conn.execute(
+                "INSERT INTO entries (content_hash, signature, analysis, created_at) VALUES (?, ?, ?, ?)",
+                (content_hash, signature.tobytes(), payload, time.time())
+            )
+            entry_id = cursor.lastrowid
+            self._conn.executemany("INSERT INTO buckets (bucket, entry_id) VALUES (?, ?)",
+                                   [(key, entry_id) for key in self._bucket_keys(signature)])
+        return entry_id
+
+    def query(self, text: str, threshold: float = 0.9) -> Optional[DuplicateMatch]:
+        normalized = normalize_text(text)
+        content_hash = self._content_hash(normalized)
+        with self._lock:
+            row = self._conn.execute("SELECT id, analysis FROM entries WHERE content_hash = ?",
+                                     (content_hash,)).fetchone()
+        if row is not None:
+            return DuplicateMatch(row[0], 1.0, True, json.loads(row[1]))
+
+        signature = self.signature(normalized, normalized=True)
+        keys = self._bucket_keys(signature)
+        placeholders = ','.join('?' * len(keys))
+        with self._lock:
+            candidates = self._conn.execute(
+                f"SELECT id, signature FROM entries WHERE id IN "
+                f"(SELECT DISTINCT entry_id FROM buckets WHERE bucket IN ({placeholders}))",
+                keys
+            ).fetchall()
+        if not candidates:
+            return None
+
+        ids = np.array([c[0] for c in candidates])
+        matrix = np.frombuffer(b''.join(c[1] for c in candidates), dtype=np.uint32).reshape(len(candidates), -1)
+        similarities = (matrix == signature).mean(axis=1)
+        best = int(similarities.argmax())
+        if similarities[best] < threshold:
+            return None
+
+        with self._lock:
+            row = self._conn.execute("SELECT analysis FROM entries WHERE id = ?", (int(ids[best]),)).fetchone()
+        if row is None:
+            return None
+        return DuplicateMatch(int(ids[best]), float(similarities[best]), False, json.loads(row[0]))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
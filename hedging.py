@@ -0,0 +1,234 @@
+import os
+import time
+import socket
+import threading
+import contextvars
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+
+class HedgePolicy:
+
+    def __init__(self, percentile: float = 0.95, budget_ratio: float = 0.05, target: str = "fallback",
+                 initial_delay: float = 30.0, min_delay: float = 1.0, min_samples: int = 20,
+                 window_size: int = 200, burst: int = 2):
+        if not 0 < percentile < 1:
+            raise ValueError("Percentil de hedge deve estar entre 0 e 1.")
+        if target not in ("fallback", "same"):
+            raise ValueError("Destino do hedge deve ser 'fallback' ou 'same'.")
+        self.percentile = percentile
+        self.budget_ratio = budget_ratio
+        self.target = target
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.window_size = window_size
+        self.burst = burst
+
+    @classmethod
+    def from_env(cls) -> "HedgePolicy":
+        return cls(
+            percentile=float(os.getenv('CVISION_HEDGE_PERCENTILE', '0.95')),
+            budget_ratio=float(os.getenv('CVISION_HEDGE_BUDGET', '0.05')),
+            target=os.getenv('CVISION_HEDGE_TARGET', 'fallback'),
+            initial_delay=float(os.getenv('CVISION_HEDGE_INITIAL_DELAY', '30'))
+        )
+
+
+def _shutdown(connection):
+    sock = getattr(connection, "sock", None)
+    if sock is not None:
+        try:
+            # socket.shutdown direto no descritor (também para SSL) desbloqueia a leitura em outra thread
+            socket.socket.shutdown(sock, socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+def cancellable_session() -> "requests.Session":
+    # Sessão que registra as conexões abertas; cancel() derruba a requisição em andamento,
+    # que então falha na thread que a executa (session.close() só fecha conexões ociosas do pool)
+    import requests
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    session = requests.Session()
+    session.cancelled = False
+    lock = threading.Lock()
+    connections = []
+
+    def tracked(base):
+        class TrackedConnection(base):
+            def connect(self):
+                super().connect()
+                with lock:
+                    connections.append(self)
+                    cancelled = session.cancelled
+                if cancelled:
+                    _shutdown(self)
+        return TrackedConnection
+
+    pool_classes = {
+        "http": type("TrackedHTTPConnectionPool", (HTTPConnectionPool,), {"ConnectionCls": tracked(HTTPConnection)}),
+        "https": type("TrackedHTTPSConnectionPool", (HTTPSConnectionPool,), {"ConnectionCls": tracked(HTTPSConnection)}),
+    }
+    for adapter in session.adapters.values():
+        adapter.poolmanager.pool_classes_by_scheme = pool_classes
+
+    def cancel():
+        with lock:
+            session.cancelled = True
+            pending = list(connections)
+        for connection in pending:
+            _shutdown(connection)
+
+    session.cancel = cancel
+    return session
+
+
+class Hedger:
+
+    def __init__(self, policy: HedgePolicy = None, max_workers: int = 32):
+        self.policy = policy or HedgePolicy()
+        # O executor só roda requisições duplicadas; a primária fica na thread de quem chama
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._latencies: Dict[str, deque] = {}
+        self._counters = {"requisicoes": 0, "hedges": 0, "hedges_vencedores": 0, "negados_orcamento": 0}
+        self._lock = threading.Lock()
+
+    def delay_for(self, task: str) -> float:
+        with self._lock:
+            samples = sorted(self._latencies.get(task, ()))
+        if len(samples) < self.policy.min_samples:
+            return self.policy.initial_delay
+        index = min(len(samples) - 1, int(len(samples) * self.policy.percentile))
+        return max(self.policy.min_delay, samples[index])
+
+    def _record_latency(self, task: str, latency: float):
+        with self._lock:
+            if task not in self._latencies:
+                self._latencies[task] = deque(maxlen=self.policy.window_size)
+            self._latencies[task].append(latency)
+
+    def _acquire_budget(self) -> bool:
+        with self._lock:
+            allowed = self._counters["hedges"] < self.policy.budget_ratio * self._counters["requisicoes"] + self.policy.burst
+            if allowed:
+                self._counters["hedges"] += 1
+            else:
+                self._counters["negados_orcamento"] += 1
+            return allowed
+
+    def counters(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        counters["taxa_hedge"] = counters["hedges"] / counters["requisicoes"] if counters["requisicoes"] else 0.0
+        return counters
+
+    # call(model, session) executa uma tentativa (hedge_call, se informado, a duplicada); a sessão do
+    # perdedor é cancelada (conexão derrubada). Sem slot livre no executor não há hedge: a primária segue sozinha
+    def execute(self, task: str, primary: str, secondary: str,
+                call: Callable[[str, "requests.Session"], "requests.Response"],
+                hedge_call: Callable[[str, "requests.Session"], "requests.Response"] = None) -> "requests.Response":
+        hedge_call = hedge_call or call
+        with self._lock:
+            self._counters["requisicoes"] += 1
+
+        start = time.monotonic()
+        delay = self.delay_for(task)
+        primary_session, hedge_session = cancellable_session(), cancellable_session()
+        state = {"primary_done": False, "hedge": None, "hedge_won": None}
+        state_lock = threading.Lock()
+        # O hedge herda o contexto de quem chama (ex: relógio de rede da reprodução de cassetes)
+        context = contextvars.copy_context()
+
+        def run_hedge():
+            try:
+                response = hedge_call(secondary, hedge_session)
+            except Exception as e:
+                return None, e
+            finally:
+                self._slots.release()
+            if response.status_code == 200:
+                with state_lock:
+                    if not state["primary_done"]:
+                        state["hedge_won"] = response
+                if state["hedge_won"] is response:
+                    primary_session.cancel()
+            return response, None
+
+        def fire():
+            with state_lock:
+                if state["primary_done"] or not self._slots.acquire(blocking=False):
+                    return
+                if not self._acquire_budget():
+                    self._slots.release()
+                    return
+                logger.warning(f"Hedge: {primary} sem resposta após {delay:.1f}s, "
+                               f"disparando requisição duplicada para {secondary}")
+                state["hedge"] = self._executor.submit(context.run, run_hedge)
+
+        # A espera do hedge é medida na thread de quem chama, sem fila de executor no caminho da primária
+        timer = threading.Timer(delay, fire)
+        timer.daemon = True
+        timer.start()
+        primary_response, primary_error = None, None
+        try:
+            primary_response = call(primary, primary_session)
+        except Exception as e:
+            primary_error = e
+        finally:
+            timer.cancel()
+            with state_lock:
+                state["primary_done"] = True
+                hedge_future, hedge_won = state["hedge"], state["hedge_won"]
+
+        try:
+            if hedge_won is not None:
+                self._record_latency(task, time.monotonic() - start)
+                with self._lock:
+                    self._counters["hedges_vencedores"] += 1
+                logger.info(f"Hedge: resposta de {secondary} venceu")
+                return hedge_won
+
+            if primary_response is not None and primary_response.status_code == 200:
+                self._record_latency(task, time.monotonic() - start)
+                return primary_response
+            if hedge_future is not None:
+                # A primária falhou: o hedge em andamento ainda pode trazer uma resposta válida
+                hedge_response, _ = hedge_future.result()
+                if hedge_response is not None and hedge_response.status_code == 200:
+                    self._record_latency(task, time.monotonic() - start)
+                    with self._lock:
+                        self._counters["hedges_vencedores"] += 1
+                    logger.info(f"Hedge: resposta de {secondary} venceu")
+                    return hedge_response
+            if primary_error is not None:
+                raise primary_error
+            return primary_response
+        finally:
+            hedge_session.cancel()
+            primary_session.close()
+            hedge_session.close()
+
+
+_default_hedger = None
+_default_hedger_lock = threading.Lock()
+
+
+def get_default_hedger() -> Optional[Hedger]:
+    global _default_hedger
+    if os.getenv('CVISION_HEDGE', '').lower() not in ('1', 'true', 'yes'):
+        return None
+    with _default_hedger_lock:
+        if _default_hedger is None:
+            _default_hedger = Hedger(HedgePolicy.from_env())
+        return _default_hedger
@@ -0,0 +1,162 @@
+import os
+import json
+import time
+import threading
+import logging
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FALLBACK_MODELS = [
+    "gemini-1.5-flash-latest",
+    "gemini-1.5-pro-latest",
+    "gemini-pro"
+]
+
+
+def estimate_tokens(text: str) -> int:
+    # Aproximação usada pela documentação do Gemini: ~4 caracteres por token
+    return max(1, len(text) // 4)
+
+
+def default_policy(model_name: str = None) -> Dict[str, Any]:
+    model_name = model_name or os.getenv('GEMINI_MODEL', 'gemini-2.5-flash')
+    return {
+        "rules": [
+            {"task": "*", "models": [model_name]}
+        ],
+        "fallback_models": DEFAULT_FALLBACK_MODELS,
+        "latency_budget_seconds": {"chat": 20, "analyze_resume": 90, "roadmap": 90, "*": 90},
+        "max_error_rate": 0.5,
+        "min_samples": 5,
+        "window_size": 50,
+        "window_seconds": 900
+    }
+
+
+def load_policy(path: str = None) -> Dict[str, Any]:
+    path = path or os.getenv('CVISION_ROUTER_POLICY')
+    policy = default_policy()
+    if not path:
+        return policy
+    with open(path, 'r', encoding='utf-8') as f:
+        custom = json.load(f)
+    if not isinstance(custom.get('rules'), list) or not custom['rules']:
+        raise ValueError(f"Política de roteamento inválida em {path}: 'rules' é obrigatório.")
+    policy.update(custom)
+    return policy
+
+
+class ModelStats:
+
+    def __init__(self, window_size: int, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._samples = deque(maxlen=window_size)
+        # record() e route() rodam em threads diferentes (pools do agente, workers da API, hedges)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool):
+        with self._lock:
+            self._samples.append((time.monotonic(), latency, ok))
+
+    def _recent(self):
+        cutoff = time.monotonic() - self.window_seconds
+        with self._lock:
+            samples = list(self._samples)
+        return [s for s in samples if s[0] >= cutoff]
+
+    def snapshot(self) -> Dict[str, Any]:
+        recent = self._recent()
+        if not recent:
+            return {"samples": 0, "p50": None, "p95": None, "error_rate": 0.0}
+        latencies = sorted(s[1] for s in recent if s[2])
+        errors = sum(1 for s in recent if not s[2])
+        return {
+            "samples": len(recent),
+            "p50": latencies[len(latencies) // 2] if latencies else None,
+            "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else None,
+            "error_rate": errors / len(recent)
+        }
+
+
+class ModelRouter:
+
+    def __init__(self, policy: Dict[str, Any] = None):
+        self.policy = policy or load_policy()
+        self._stats: Dict[str, ModelStats] = {}
+        self._lock = threading.Lock()
+
+    def _stats_for(self, model: str) -> ModelStats:
+        with self._lock:
+            if model not in self._stats:
+                self._stats[model] = ModelStats(self.policy['window_size'], self.policy['window_seconds'])
+            return self._stats[model]
+
+    def _match_rule(self, task: str, input_tokens: int, output_tokens: int) -> Dict[str, Any]:
+        for rule in self.policy['rules']:
+            if rule.get('task', '*') not in ('*', task):
+                continue
+            if input_tokens > rule.get('max_input_tokens', float('inf')):
+                continue
+            if output_tokens > rule.get('max_output_tokens', float('inf')):
+                continue
+            return rule
+        return self.policy['rules'][-1]
+
+    def _health(self, model: str, task: str) -> Optional[str]:
+        stats = self._stats_for(model).snapshot()
+        if stats['samples'] < self.policy['min_samples']:
+            return None
+        if stats['error_rate'] > self.policy['max_error_rate']:
+            return f"taxa de erro {stats['error_rate']:.0%}"
+        budgets = self.policy['latency_budget_seconds']
+        budget = budgets.get(task, budgets.get('*'))
+        if budget and stats['p95'] is not None and stats['p95'] > budget:
+            return f"p95 {stats['p95']:.1f}s > {budget}s"
+        return None
+
+    def route(self, task: str, input_tokens: int, output_tokens: int) -> List[str]:
+        rule = self._match_rule(task, input_tokens, output_tokens)
+        ordered = []
+        for model in list(rule['models']) + list(self.policy.get('fallback_models', [])):
+            if model not in ordered:
+                ordered.append(model)
+
+        healthy, degraded, reasons = [], [], {}
+        for model in ordered:
+            problem = self._health(model, task)
+            if problem:
+                degraded.append(model)
+                reasons[model] = problem
+            else:
+                healthy.append(model)
+
+        # Modelos degradados continuam como último recurso
+        candidates = healthy + degraded
+        reason = f"regra {rule.get('name', rule.get('task', '*'))}"
+        if reasons:
+            reason += "; degradados: " + ", ".join(f"{m} ({r})" for m, r in reasons.items())
+        logger.info(f"Roteador: tarefa={task} entrada≈{input_tokens} tokens saída≤{output_tokens} "
+                    f"-> {candidates[0]} ({reason})")
+        return candidates
+
+    def record(self, model: str, latency: float, ok: bool):
+        self._stats_for(model).record(latency, ok)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            models = list(self._stats)
+        return {model: self._stats_for(model).snapshot() for model in models}
+
+
+_default_router = None
+_default_router_lock = threading.Lock()
+
+
+def get_default_router() -> ModelRouter:
+    global _default_router
+    with _default_router_lock:
+        if _default_router is None:
+            _default_router = ModelRouter()
+        return _default_router
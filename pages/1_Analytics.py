@@ -0,0 +1,92 @@
+import streamlit as st
+import plotly.graph_objects as go
+from analytics_store import AnalyticsStore, NIVEIS_SENIORIDADE
+
+st.set_page_config(
+    page_title="CVision AI | Analytics",
+    page_icon="👁️",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+
+@st.cache_resource
+def get_store():
+    return AnalyticsStore()
+
+
+# O fingerprint do dataset entra na chave do cache: novos arquivos invalidam os agregados
+@st.cache_data(show_spinner=False, max_entries=64)
+def load_aggregates(fingerprint, senioridade, min_anos, max_anos, top):
+    store = get_store()
+    filters = dict(senioridade=list(senioridade) or None, min_anos=min_anos, max_anos=max_anos)
+    return {
+        "total": store.count(**filters),
+        "senioridade": store.seniority_distribution(**filters),
+        "lacunas": store.top_technical_gaps(top=top, **filters),
+        "cargos": store.top_next_roles(top=top, **filters),
+        "anos": store.experience_summary(**filters),
+    }
+
+
+def create_horizontal_bar(labels, values, title):
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=list(values)[::-1],
+        y=list(labels)[::-1],
+        orientation='h',
+        marker=dict(color='#00d4ff')
+    ))
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#fafafa', family='monospace'),
+        height=max(300, 28 * len(labels) + 80),
+        margin=dict(l=10, r=10, t=50, b=10),
+        title=dict(text=title, font=dict(color='#00d4ff', size=16))
+    )
+    return fig
+
+
+st.markdown("## 📈 Analytics de Currículos")
+
+store = get_store()
+
+with st.sidebar:
+    st.markdown("### 🔎 Filtros")
+    senioridade = st.multiselect("Senioridade", NIVEIS_SENIORIDADE)
+    anos = st.slider("Anos de experiência", 0, 40, (0, 40))
+    top = st.slider("Itens por ranking", 5, 30, 15)
+
+min_anos = anos[0] if anos[0] > 0 else None
+max_anos = anos[1] if anos[1] < 40 else None
+data = load_aggregates(store.fingerprint(), tuple(senioridade), min_anos, max_anos, top)
+
+if data["total"] == 0:
+    st.info("Nenhuma análise armazenada ainda. Analise currículos ou importe arquivos com `python analytics_store.py`.")
+    st.stop()
+
+col1, col2, col3, col4 = st.columns(4)
+resumo = data["anos"]
+col1.metric("Análises", f"{data['total']:,}".replace(',', '.'))
+col2.metric("Média de Experiência", f"{resumo['media']} anos" if resumo['media'] is not None else "N/A")
+col3.metric("Mediana", f"{resumo['mediana']} anos" if resumo['mediana'] is not None else "N/A")
+col4.metric("Percentil 90", f"{resumo['p90']} anos" if resumo['p90'] is not None else "N/A")
+
+st.markdown("---")
+
+col_graph1, col_graph2 = st.columns(2)
+
+with col_graph1:
+    dist = data["senioridade"]
+    st.plotly_chart(create_horizontal_bar(dist["senioridade"], dist["total"], "Distribuição de Senioridade"),
+                    use_container_width=True)
+
+with col_graph2:
+    cargos = data["cargos"]
+    st.plotly_chart(create_horizontal_bar(cargos["cargo"], cargos["total"], "Próximos Cargos Mais Comuns"),
+                    use_container_width=True)
+
+lacunas = data["lacunas"]
+st.plotly_chart(create_horizontal_bar(lacunas["skill"], lacunas["total"], "Principais Lacunas Técnicas"),
+                use_container_width=True)
@@ -0,0 +1,195 @@
+import os
+import time
+import threading
+import logging
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+WINDOW_SECONDS = 60.0
+STALE_WAITER_SECONDS = 30.0
+
+
+class QuotaExceeded(Exception):
+    pass
+
+
+class QuotaCoordinator:
+
+    def __init__(self, path: str = None, rpm: int = None, tpm: int = None, timeout: float = None):
+        import sqlite3
+
+        self.path = path or os.getenv('CVISION_QUOTA_DB', os.path.join('data', 'quota.sqlite'))
+        rpm = rpm or (int(os.getenv('CVISION_QUOTA_RPM')) if os.getenv('CVISION_QUOTA_RPM') else None)
+        tpm = tpm or (int(os.getenv('CVISION_QUOTA_TPM')) if os.getenv('CVISION_QUOTA_TPM') else None)
+        self.timeout = timeout if timeout is not None else float(os.getenv('CVISION_QUOTA_TIMEOUT', '60'))
+        self.pid = os.getpid()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        # O lock de escrita do SQLite (BEGIN IMMEDIATE) serializa as reservas entre processos
+        self._conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS usage (
+                id INTEGER PRIMARY KEY,
+                bucket TEXT NOT NULL,
+                ts REAL NOT NULL,
+                tokens INTEGER NOT NULL,
+                pid INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_usage_bucket_ts ON usage(bucket, ts);
+            CREATE TABLE IF NOT EXISTS waiters (
+                ticket INTEGER PRIMARY KEY AUTOINCREMENT,
+                bucket TEXT NOT NULL,
+                tokens INTEGER NOT NULL,
+                pid INTEGER NOT NULL,
+                heartbeat REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_waiters_bucket ON waiters(bucket, ticket);
+            CREATE TABLE IF NOT EXISTS limits (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            INSERT OR IGNORE INTO limits (key, value) VALUES ('rpm', 15), ('tpm', 1000000);
+        """)
+        # Limites ficam no próprio arquivo para que todos os processos do host usem os mesmos valores
+        for key, value in (('rpm', rpm), ('tpm', tpm)):
+            if value:
+                self._transaction(lambda conn: conn.execute(
+                    "UPDATE limits SET value = ? WHERE key = ?", (value, key)))
+
+    @property
+    def rpm(self) -> int:
+        return self._limits()['rpm']
+
+    @property
+    def tpm(self) -> int:
+        return self._limits()['tpm']
+
+    def _limits(self, conn=None) -> Dict[str, int]:
+        if conn is not None:
+            return dict(conn.execute("SELECT key, value FROM limits").fetchall())
+        with self._lock:
+            return dict(self._conn.execute("SELECT key, value FROM limits").fetchall())
+
+    def _transaction(self, fn):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn)
+                self._conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _purge(self, conn, now: float):
+        conn.execute("DELETE FROM usage WHERE ts < ?", (now - WINDOW_SECONDS,))
+        conn.execute("DELETE FROM waiters WHERE heartbeat < ?", (now - STALE_WAITER_SECONDS,))
+
+    def reserve(self, bucket: str, tokens: int, timeout: float = None) -> int:
+        # timeout=0 tenta uma única vez, sem entrar na espera
+        ticket = self._transaction(lambda conn: conn.execute(
+            "INSERT INTO waiters (bucket, tokens, pid, heartbeat) VALUES (?, ?, ?, ?)",
+            (bucket, tokens, self.pid, time.time())
+        ).lastrowid)
+
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        waited = False
+
+        def attempt(conn):
+            now = time.time()
+            self._purge(conn, now)
+            conn.execute("UPDATE waiters SET heartbeat = ? WHERE ticket = ?", (now, ticket))
+            # Fila FIFO entre processos: só o ticket mais antigo do bucket pode reservar
+            first = conn.execute("SELECT MIN(ticket) FROM waiters WHERE bucket = ?", (bucket,)).fetchone()[0]
+            if first is not None and first != ticket:
+                return None, 0.05
+            limits = self._limits(conn)
+            requested = min(tokens, limits['tpm'])
+            requests_used, tokens_used, oldest = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tokens), 0), MIN(ts) FROM usage WHERE bucket = ?", (bucket,)
+            ).fetchone()
+            if requests_used + 1 <= limits['rpm'] and tokens_used + requested <= limits['tpm']:
+                conn.execute("DELETE FROM waiters WHERE ticket = ?", (ticket,))
+                reservation = conn.execute(
+                    "INSERT INTO usage (bucket, ts, tokens, pid) VALUES (?, ?, ?, ?)",
+                    (bucket, now, requested, self.pid)
+                ).lastrowid
+                return reservation, 0
+            retry_in = (oldest + WINDOW_SECONDS - now) if oldest else 0.05
+            return None, min(1.0, max(0.05, retry_in))
+
+        try:
+            while True:
+                reservation, retry_in = self._transaction(attempt)
+                if reservation is not None:
+                    if waited:
+                        logger.info(f"Cota: reserva liberada para {bucket} após espera")
+                    return reservation
+                if time.monotonic() + retry_in > deadline:
+                    raise QuotaExceeded(f"Cota local de {bucket} esgotada após {timeout:.0f}s de espera")
+                if not waited:
+                    logger.info(f"Cota: aguardando capacidade para {bucket} ({tokens} tokens)")
+                    waited = True
+                time.sleep(retry_in)
+        except BaseException:
+            self._transaction(lambda conn: conn.execute("DELETE FROM waiters WHERE ticket = ?", (ticket,)))
+            raise
+
+    def settle(self, reservation: int, actual_tokens: int):
+        self._transaction(lambda conn: conn.execute(
+            "UPDATE usage SET tokens = ? WHERE id = ?", (max(0, int(actual_tokens)), reservation)
+        ))
+
+    def status(self) -> Dict[str, Any]:
+        def read(conn):
+            now = time.time()
+            self._purge(conn, now)
+            limits = self._limits(conn)
+            rpm, tpm = limits['rpm'], limits['tpm']
+            buckets = {}
+            for bucket, count, tokens in conn.execute(
+                "SELECT bucket, COUNT(*), COALESCE(SUM(tokens), 0) FROM usage GROUP BY bucket"
+            ):
+                buckets[bucket] = {"requisicoes_restantes": max(0, rpm - count),
+                                   "tokens_restantes": max(0, tpm - tokens), "na_fila": 0}
+            for bucket, waiting in conn.execute("SELECT bucket, COUNT(*) FROM waiters GROUP BY bucket"):
+                buckets.setdefault(bucket, {"requisicoes_restantes": rpm, "tokens_restantes": tpm})
+                buckets[bucket]["na_fila"] = waiting
+            processes = conn.execute(
+                "SELECT COUNT(DISTINCT pid) FROM (SELECT pid FROM usage UNION SELECT pid FROM waiters)"
+            ).fetchone()[0]
+            return {"limite_rpm": rpm, "limite_tpm": tpm, "processos_ativos": processes,
+                    "buckets": buckets}
+        return self._transaction(read)
+
+
+_default_quota = None
+_default_quota_lock = threading.Lock()
+
+
+def get_default_quota() -> Optional[QuotaCoordinator]:
+    global _default_quota
+    if not os.getenv('CVISION_QUOTA_DB'):
+        return None
+    with _default_quota_lock:
+        if _default_quota is None:
+            _default_quota = QuotaCoordinator()
+        return _default_quota
+
+
+if __name__ == "__main__":
+    import json
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Estado da cota compartilhada entre processos")
+    parser.add_argument("--db", default=None)
+    parser.add_argument("--watch", type=float, default=0, help="Atualiza a cada N segundos")
+    args = parser.parse_args()
+
+    coordinator = QuotaCoordinator(args.db)
+    while True:
+        print(json.dumps(coordinator.status(), ensure_ascii=False, indent=2))
+        if not args.watch:
+            break
+        time.sleep(args.watch)
@@ -0,0 +1,88 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(namespace: str, *parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in (namespace,) + parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x00')
+    return f"{namespace}:{digest.hexdigest()}"
+
+
+class ResultCache:
+
+    def __init__(self, max_entries: int = 2048, path: str = None):
+        self.max_entries = max_entries
+        self.path = path
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            import sqlite3
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            if self._conn is None:
+                return None
+            row = self._conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value = json.loads(row[0])
+            self._remember(key, value)
+            return value
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._remember(key, value)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO results (key, value, created_at) VALUES (?, ?, ?)",
+                        (key, json.dumps(value, ensure_ascii=False), time.time())
+                    )
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+
+    def _remember(self, key: str, value: Any):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> ResultCache:
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache(
+                max_entries=int(os.getenv('CVISION_CACHE_ENTRIES', '2048')),
+                path=os.getenv('CVISION_CACHE_PATH')
+            )
+        return _default_cache
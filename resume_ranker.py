@@ -0,0 +1,371 @@
+import os
+import re
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+import logging
+import unicodedata
+from typing import Dict, Any, List, Iterable, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Vocabulário canônico de skills: variantes normalizadas (sem acento, minúsculas) -> nome canônico
+SKILL_ALIASES = {
+    'python': ['python', 'python3'],
+    'java': ['java'],
+    'javascript': ['javascript', 'js', 'ecmascript', 'es6'],
+    'typescript': ['typescript', 'ts'],
+    'go': ['golang', 'go lang'],
+    'c#': ['c#', 'csharp', 'c sharp'],
+    'c++': ['c++', 'cpp'],
+    'ruby': ['ruby'],
+    'php': ['php'],
+    'kotlin': ['kotlin'],
+    'swift': ['swift'],
+    'rust': ['rust'],
+    'scala': ['scala'],
+    'r': ['linguagem r', 'rstudio'],
+    'sql': ['sql', 't-sql', 'tsql', 'pl/sql', 'plsql'],
+    'react': ['react', 'reactjs', 'react.js'],
+    'react native': ['react native'],
+    'angular': ['angular', 'angularjs'],
+    'vue': ['vue', 'vuejs', 'vue.js'],
+    'node.js': ['node', 'nodejs', 'node.js'],
+    'django': ['django'],
+    'flask': ['flask'],
+    'fastapi': ['fastapi'],
+    'spring': ['spring', 'spring boot', 'springboot'],
+    '.net': ['.net', 'dotnet', 'asp.net', '.net core'],
+    'rails': ['rails', 'ruby on rails'],
+    'postgresql': ['postgresql', 'postgres'],
+    'mysql': ['mysql', 'mariadb'],
+    'oracle': ['oracle'],
+    'sql server': ['sql server', 'mssql'],
+    'mongodb': ['mongodb', 'mongo'],
+    'redis': ['redis'],
+    'elasticsearch': ['elasticsearch', 'elastic search', 'opensearch'],
+    'kafka': ['kafka'],
+    'rabbitmq': ['rabbitmq'],
+    'spark': ['spark', 'pyspark'],
+    'airflow': ['airflow'],
+    'dbt': ['dbt'],
+    'pandas': ['pandas'],
+    'numpy': ['numpy'],
+    'machine learning': ['machine learning', 'aprendizado de maquina', 'ml'],
+    'deep learning': ['deep learning', 'aprendizado profundo'],
+    'tensorflow': ['tensorflow'],
+    'pytorch': ['pytorch', 'torch'],
+    'scikit-learn': ['scikit-learn', 'sklearn', 'scikit learn'],
+    'nlp': ['nlp', 'processamento de linguagem natural'],
+    'llm': ['llm', 'llms', 'genai', 'ia generativa'],
+    'power bi': ['power bi', 'powerbi'],
+    'tableau': ['tableau'],
+    'excel': ['excel'],
+    'aws': ['aws', 'amazon web services'],
+    'azure': ['azure'],
+    'gcp': ['gcp', 'google cloud'],
+    'docker': ['docker'],
+    'kubernetes': ['kubernetes', 'k8s', 'eks', 'aks', 'gke'],
+    'terraform': ['terraform'],
+    'ansible': ['ansible'],
+    'ci/cd': ['ci/cd', 'ci cd', 'jenkins', 'github actions', 'gitlab ci'],
+    'linux': ['linux'],
+    'git': ['git', 'github', 'gitlab'],
+    'microservices': ['microservices', 'microsservicos', 'micro servicos'],
+    'rest': ['rest', 'restful', 'api rest'],
+    'graphql': ['graphql'],
+    'grpc': ['grpc'],
+    'observability': ['observabilidade', 'observability', 'prometheus', 'grafana', 'datadog'],
+    'security': ['seguranca da informacao', 'appsec', 'owasp', 'cybersecurity'],
+    'testing': ['testes automatizados', 'tdd', 'pytest', 'junit', 'jest', 'cypress', 'selenium'],
+    'agile': ['agile', 'agil', 'scrum', 'kanban'],
+    'product management': ['product management', 'gestao de produto', 'product owner'],
+    'project management': ['gestao de projetos', 'project management', 'pmp', 'pmbok'],
+    'leadership': ['lideranca', 'leadership', 'gestao de pessoas', 'tech lead'],
+    'communication': ['comunicacao', 'communication'],
+    'english': ['ingles', 'english'],
+    'spanish': ['espanhol', 'spanish'],
+    'ux': ['ux', 'ui/ux', 'figma', 'design de interacao'],
+    'sap': ['sap'],
+    'salesforce': ['salesforce'],
+}
+
+SKILLS = sorted(SKILL_ALIASES)
+_SKILL_INDEX = {skill: i for i, skill in enumerate(SKILLS)}
+
+STOPWORDS = set("""
+a o as os um uma uns umas de do da dos das em no na nos nas por pelo pela para com sem sob sobre e ou
+que se ao aos como mais menos muito ja nao sim entre ate apos desde seu sua seus suas este esta isso
+the an and or of in on at to for with by from as is are be was were this that it its our your we you
+""".split())
+
+# Ponto inicial só no começo de palavra e antes de letra (.net, .net core), sem juntar fim de frase.
+# "/" separa tokens: "Python/Django" e "AWS/GCP" são stacks; ci/cd, pl/sql e ui/ux viram aliases de duas palavras
+_TOKEN_RE = re.compile(r'(?:(?<![a-z0-9])\.(?=[a-z]))?[a-z0-9][a-z0-9+#.-]*')
+
+
+def normalize(text: str) -> str:
+    return unicodedata.normalize('NFKD', text.lower()).encode('ascii', 'ignore').decode('ascii')
+
+
+def _raw_tokens(text: str) -> List[str]:
+    return [t.rstrip('.-') for t in _TOKEN_RE.findall(normalize(text))]
+
+
+# Aliases passam pelo mesmo tokenizador do texto ("ci/cd" -> "ci cd")
+_SKILL_LOOKUP = {' '.join(_raw_tokens(alias)): skill for skill, aliases in SKILL_ALIASES.items() for alias in aliases}
+_MAX_SKILL_WORDS = max(len(alias.split()) for alias in _SKILL_LOOKUP)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _raw_tokens(text) if len(t) > 1 and t not in STOPWORDS and not t.isdigit()]
+
+
+def extract_skills(text: str) -> Set[str]:
+    tokens = _raw_tokens(text)
+    found = set()
+    for i in range(len(tokens)):
+        for size in range(1, _MAX_SKILL_WORDS + 1):
+            if i + size > len(tokens):
+                break
+            skill = _SKILL_LOOKUP.get(' '.join(tokens[i:i + size]))
+            if skill:
+                found.add(skill)
+    return found
+
+
+class RankedCandidate(NamedTuple):
+    external_id: str
+    score: float
+    bm25: float
+    skill_coverage: float
+    matched_skills: List[str]
+    missing_skills: List[str]
+
+
+class ResumeRankingIndex:
+
+    def __init__(self, path: str = None, k1: float = 1.5, b: float = 0.75, skill_weight: float = 0.4):
+        self.path = path or os.getenv('CVISION_RANKING_INDEX', os.path.join('data', 'ranking.sqlite'))
+        self.k1 = k1
+        self.b = b
+        self.skill_weight = skill_weight
+
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS docs (
+                id INTEGER PRIMARY KEY,
+                external_id TEXT UNIQUE NOT NULL,
+                content_hash TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                skills TEXT NOT NULL,
+                text BLOB NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                doc_id INTEGER NOT NULL,
+                tf INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_postings_term ON postings(term);
+            CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings(doc_id);
+        """)
+        # Colunas densas (ids, comprimentos, matriz de skills) recarregadas só após escritas
+        self._matrix_version = None
+        self._version = 0
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._external_ids: List[str] = []
+        self._lengths = np.zeros(0, dtype=np.float32)
+        self._skills = np.zeros((0, len(SKILLS)), dtype=np.float32)
+
+    def _delete(self, external_id: str):
+        row = self._conn.execute("SELECT id FROM docs WHERE external_id = ?", (external_id,)).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (row[0],))
+            self._conn.execute("DELETE FROM docs WHERE id = ?", (row[0],))
+
+    def add_many(self, items: Iterable[Tuple[str, str]]) -> int:
+        added = 0
+        with self._lock, self._conn:
+            for external_id, text in items:
+                tokens = tokenize(text)
+                content_hash = hashlib.sha256(' '.join(tokens).encode('utf-8')).hexdigest()
+                row = self._conn.execute("SELECT content_hash FROM docs WHERE external_id = ?",
+                                         (external_id,)).fetchone()
+                if row is not None and row[0] == content_hash:
+                    continue
+                self._delete(external_id)
+                counts: Dict[str, int] = {}
+                for token in tokens:
+                    counts[token] = counts.get(token, 0) + 1
+                doc_id = self._conn.execute(
+                    "INSERT INTO docs (external_id, content_hash, length, skills, text, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (external_id, content_hash, len(tokens), json.dumps(sorted(extract_skills(text))),
+                     zlib.compress(text.encode('utf-8')), time.time())
+                ).lastrowid
+                self._conn.executemany("INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)",
+                                       [(term, doc_id, tf) for term, tf in counts.items()])
+                added += 1
+            self._version += 1
+        return added
+
+    def add(self, external_id: str, text: str) -> bool:
+        return self.add_many([(external_id, text)]) > 0
+
+    def remove(self, external_id: str):
+        with self._lock, self._conn:
+            self._delete(external_id)
+            self._version += 1
+
+    def text(self, external_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT text FROM docs WHERE external_id = ?", (external_id,)).fetchone()
+        return zlib.decompress(row[0]).decode('utf-8') if row else None
+
+    def _load_columns(self):
+        # data_version muda quando outra conexão grava no arquivo; _version cobre as escritas desta
+        version = (self._version, self._conn.execute("PRAGMA data_version").fetchone()[0])
+        if self._matrix_version == version:
+            return
+        rows = self._conn.execute("SELECT id, external_id, length, skills FROM docs ORDER BY id").fetchall()
+        self._ids = np.array([r[0] for r in rows], dtype=np.int64)
+        self._external_ids = [r[1] for r in rows]
+        self._lengths = np.array([r[2] for r in rows], dtype=np.float32)
+        skills = np.zeros((len(rows), len(SKILLS)), dtype=np.float32)
+        for i, r in enumerate(rows):
+            for skill in json.loads(r[3]):
+                if skill in _SKILL_INDEX:
+                    skills[i, _SKILL_INDEX[skill]] = 1.0
+        self._skills = skills
+        self._matrix_version = version
+
+    def _postings(self, terms: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        term_ids, doc_ids, tfs = [], [], []
+        for start in range(0, len(terms), 500):
+            batch = terms[start:start + 500]
+            index = {term: i for i, term in enumerate(batch, start)}
+            placeholders = ','.join('?' * len(batch))
+            for term, doc_id, tf in self._conn.execute(
+                f"SELECT term, doc_id, tf FROM postings WHERE term IN ({placeholders})", batch
+            ):
+                term_ids.append(index[term])
+                doc_ids.append(doc_id)
+                tfs.append(tf)
+        return (np.array(term_ids, dtype=np.int64), np.array(doc_ids, dtype=np.int64),
+                np.array(tfs, dtype=np.float32))
+
+    def rank(self, job_description: str, top_k: int = 50) -> List[RankedCandidate]:
+        terms = sorted(set(tokenize(job_description)))
+        job_skills = extract_skills(job_description)
+        with self._lock:
+            self._load_columns()
+            ids, external_ids, lengths, skills = self._ids, self._external_ids, self._lengths, self._skills
+            term_ids, doc_ids, tfs = self._postings(terms) if terms else (np.zeros(0, dtype=np.int64),) * 3
+        n = len(ids)
+        if n == 0:
+            return []
+
+        # BM25 de todo o conjunto em uma passada vetorizada sobre as postings dos termos da vaga
+        rows = np.searchsorted(ids, doc_ids)
+        df = np.bincount(term_ids, minlength=len(terms)).astype(np.float32)
+        idf = np.log1p((n - df + 0.5) / (df + 0.5))
+        avgdl = max(float(lengths.mean()), 1.0)
+        norm = self.k1 * (1 - self.b + self.b * lengths[rows] / avgdl)
+        weights = idf[term_ids] * tfs * (self.k1 + 1) / (tfs + norm)
+        bm25 = np.bincount(rows, weights=weights, minlength=n)
+
+        if job_skills:
+            query = np.zeros(len(SKILLS), dtype=np.float32)
+            query[[_SKILL_INDEX[s] for s in job_skills]] = 1.0
+            coverage = skills @ query / query.sum()
+            skill_weight = self.skill_weight
+        else:
+            coverage = np.zeros(n, dtype=np.float32)
+            skill_weight = 0.0
+        top_bm25 = float(bm25.max())
+        scores = (1 - skill_weight) * (bm25 / top_bm25 if top_bm25 > 0 else bm25) + skill_weight * coverage
+
+        k = min(top_k, n)
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        results = []
+        for row in best:
+            doc_skills = {SKILLS[i] for i in np.flatnonzero(skills[row])}
+            results.append(RankedCandidate(
+                external_id=external_ids[row],
+                score=round(float(scores[row]), 4),
+                bm25=round(float(bm25[row]), 4),
+                skill_coverage=round(float(coverage[row]), 4),
+                matched_skills=sorted(job_skills & doc_skills),
+                missing_skills=sorted(job_skills - doc_skills),
+            ))
+        return results
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_default_ranking_index() -> Optional[ResumeRankingIndex]:
+    global _default_index
+    if not os.getenv('CVISION_RANKING_INDEX'):
+        return None
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = ResumeRankingIndex()
+        return _default_index
+
+
+if __name__ == "__main__":
+    import glob
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Índice local de pré-ranqueamento de currículos")
+    parser.add_argument("--index", default=None)
+    sub = parser.add_subparsers(dest="command", required=True)
+    add_parser = sub.add_parser("add", help="Indexa arquivos .txt (o nome do arquivo vira o id)")
+    add_parser.add_argument("paths", nargs="+")
+    rank_parser = sub.add_parser("rank", help="Ranqueia o índice contra uma descrição de vaga")
+    rank_parser.add_argument("job_file")
+    rank_parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    index = ResumeRankingIndex(args.index)
+    if args.command == "add":
+        files = [f for p in args.paths for f in (sorted(glob.glob(os.path.join(p, '*.txt'))) if os.path.isdir(p) else [p])]
+
+        def read(path):
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                return os.path.splitext(os.path.basename(path))[0], f.read()
+
+        start = time.perf_counter()
+        added = index.add_many(read(f) for f in files)
+        logger.info(f"{added} currículos indexados ({len(files) - added} sem alteração) em "
+                    f"{time.perf_counter() - start:.1f}s; total no índice: {len(index)}")
+    else:
+        with open(args.job_file, 'r', encoding='utf-8') as f:
+            job = f.read()
+        start = time.perf_counter()
+        ranked = index.rank(job, top_k=args.top)
+        logger.info(f"{len(index)} currículos ranqueados em {(time.perf_counter() - start) * 1000:.0f}ms")
+        for position, candidate in enumerate(ranked, 1):
+            print(json.dumps({"posicao": position, **candidate._asdict()}, ensure_ascii=False))
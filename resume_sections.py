@@ -0,0 +1,174 @@
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from typing import List, NamedTuple, Tuple
+
+SECTION_HEADINGS = {
+    'resumo': ['resumo', 'perfil', 'sobre', 'objetivo', 'summary', 'profile', 'about', 'objective'],
+    'experiencia': ['experiencia', 'experiencias', 'experiencia profissional', 'historico profissional',
+                    'experience', 'work experience', 'employment', 'professional experience'],
+    'habilidades': ['habilidades', 'competencias', 'conhecimentos', 'skills', 'tecnologias',
+                    'competencias tecnicas', 'technical skills', 'stack'],
+    'formacao': ['formacao', 'formacao academica', 'educacao', 'escolaridade', 'education', 'academic background'],
+    'certificacoes': ['certificacoes', 'certificados', 'cursos', 'certifications', 'courses', 'licenses'],
+    'projetos': ['projetos', 'portfolio', 'projects'],
+    'publicacoes': ['publicacoes', 'artigos', 'producao bibliografica', 'publications', 'papers'],
+    'idiomas': ['idiomas', 'linguas', 'languages'],
+    'premios': ['premios', 'conquistas', 'awards', 'achievements'],
+    'outros': ['atividades', 'voluntariado', 'informacoes adicionais', 'interesses', 'volunteer', 'interests'],
+}
+
+_HEADING_LOOKUP = {alias: name for name, aliases in SECTION_HEADINGS.items() for alias in aliases}
+
+
+class Section(NamedTuple):
+    name: str
+    heading: str
+    text: str
+
+
+def _fold(text: str) -> str:
+    text = unicodedata.normalize('NFKD', text.lower()).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z ]', '', text).strip()
+
+
+def _heading_name(line: str) -> str:
+    stripped = line.strip().strip(':').strip()
+    if not stripped or len(stripped) > 60:
+        return None
+    folded = _fold(stripped)
+    if folded in _HEADING_LOOKUP:
+        return _HEADING_LOOKUP[folded]
+    # Títulos em caixa alta com complemento (ex: "EXPERIÊNCIA PROFISSIONAL E ACADÊMICA") só contam
+    # se começarem por um título conhecido; as demais linhas em caixa alta (nome, "SQL, AWS",
+    # "AWS CERTIFIED DEVELOPER") são conteúdo da seção
+    if stripped.isupper() and len(stripped.split()) <= 5:
+        for alias, name in _HEADING_LOOKUP.items():
+            if folded.startswith(alias + ' '):
+                return name
+    return None
+
+
+def split_sections(text: str) -> List[Section]:
+    sections = []
+    name, heading, lines = 'cabecalho', '', []
+    for line in text.splitlines():
+        detected = _heading_name(line)
+        if detected:
+            # Seção com título é mantida mesmo sem corpo: o título também é conteúdo do currículo
+            if heading or any(l.strip() for l in lines):
+                sections.append(Section(name, heading, '\n'.join(lines).strip()))
+            name, heading, lines = detected, line.strip(), []
+        else:
+            lines.append(line)
+    if heading or any(l.strip() for l in lines):
+        sections.append(Section(name, heading, '\n'.join(lines).strip()))
+    return sections
+
+
+def _split_oversized(text: str, max_chars: int) -> List[str]:
+    pieces, current = [], ''
+    for paragraph in re.split(r'\n\s*\n', text):
+        while len(paragraph) > max_chars:
+            cut = paragraph.rfind('\n', 0, max_chars)
+            if cut <= 0:
+                cut = paragraph.rfind(' ', 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            pieces.append(paragraph[:cut])
+            paragraph = paragraph[cut:].lstrip()
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            pieces.append(current)
+            current = paragraph
+        else:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_document(text: str, max_chars: int = 12000) -> List[str]:
+    chunks, current = [], ''
+    for section in split_sections(text):
+        block = f"{section.heading}\n{section.text}".strip()
+        if len(block) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ''
+            # Repete o título em cada pedaço para manter o contexto da seção
+            for piece in _split_oversized(section.text, max_chars - len(section.heading) - 1):
+                chunks.append(f"{section.heading}\n{piece}".strip())
+            continue
+        if current and len(current) + len(block) + 2 > max_chars:
+            chunks.append(current)
+            current = block
+        else:
+            current = f"{current}\n\n{block}" if current else block
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class SectionChange(NamedTuple):
+    name: str
+    before: str
+    after: str
+
+
+def _normalize_whitespace(text: str) -> str:
+    return ' '.join(text.split())
+
+
+def diff_sections(old_text: str, new_text: str) -> List[SectionChange]:
+    # Seções repetidas (ex: dois blocos "outros") são pareadas pela ordem de ocorrência.
+    # O título entra na comparação: uma seção nova só com título, ou um título alterado, também é mudança
+    def keyed(text):
+        counts, result = {}, {}
+        for section in split_sections(text):
+            index = counts.get(section.name, 0)
+            counts[section.name] = index + 1
+            result[(section.name, index)] = '\n'.join(part for part in (section.heading, section.text) if part)
+        return result
+
+    old_sections, new_sections = keyed(old_text), keyed(new_text)
+    changes = []
+    for key in list(old_sections) + [k for k in new_sections if k not in old_sections]:
+        before, after = old_sections.get(key, ''), new_sections.get(key, '')
+        if _normalize_whitespace(before) != _normalize_whitespace(after):
+            changes.append(SectionChange(key[0], before, after))
+    return changes
+
+
+def _content_lines(text: str) -> List[str]:
+    return [_normalize_whitespace(line) for line in text.splitlines() if line.strip()]
+
+
+def _line_opcodes(before: List[str], after: List[str]):
+    return [op for op in SequenceMatcher(None, before, after, autojunk=False).get_opcodes() if op[0] != 'equal']
+
+
+def change_hunks(change: SectionChange) -> List[Tuple[str, str]]:
+    # Apenas as linhas alteradas da seção, como pares (antes, depois)
+    before, after = _content_lines(change.before), _content_lines(change.after)
+    return [('\n'.join(before[i1:i2]), '\n'.join(after[j1:j2]))
+            for _, i1, i2, j1, j2 in _line_opcodes(before, after)]
+
+
+def _changed_chars(change: SectionChange) -> int:
+    total = 0
+    for old, new in change_hunks(change):
+        if old and new:
+            # Linhas reescritas contam só os caracteres que mudaram (ex: correção de digitação)
+            total += sum((i2 - i1) + (j2 - j1)
+                         for tag, i1, i2, j1, j2 in SequenceMatcher(None, old, new, autojunk=False).get_opcodes()
+                         if tag != 'equal')
+        else:
+            total += len(old) + len(new)
+    return total
+
+
+def change_ratio(changes: List[SectionChange], old_text: str, new_text: str) -> float:
+    total = len(old_text) + len(new_text)
+    if not total:
+        return 0.0
+    return sum(_changed_chars(change) for change in changes) / total
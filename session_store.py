@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import zlib
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Payloads de sessão comprimidos e endereçados por conteúdo, com limite de bytes e despejo LRU.
+# A sessão guarda só o vínculo (sessão, nome) -> hash; payloads idênticos entre sessões são gravados uma vez
+class SessionStore:
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, path: str = None):
+        self.max_bytes = max_bytes
+        self.path = path
+        self._lock = threading.Lock()
+        self._blobs: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bindings: Dict[tuple, str] = {}
+        self._holders: Dict[str, set] = {}
+        self._size = 0
+        self.evictions = 0
+        self._conn = None
+        if path:
+            import sqlite3
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS blobs (
+                    digest TEXT PRIMARY KEY,
+                    data BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_blobs_access ON blobs(last_access);
+                CREATE TABLE IF NOT EXISTS bindings (
+                    session_id TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    digest TEXT NOT NULL,
+                    PRIMARY KEY (session_id, name)
+                );
+                CREATE INDEX IF NOT EXISTS idx_bindings_digest ON bindings(digest);
+            """)
+            self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+    def put(self, value: Any) -> str:
+        raw = self._encode(value)
+        digest = hashlib.sha256(raw).hexdigest()
+        with self._lock:
+            if self._conn is None:
+                if digest in self._blobs:
+                    self._blobs.move_to_end(digest)
+                    return digest
+                data = zlib.compress(raw, 6)
+                self._blobs[digest] = data
+                self._size += len(data)
+            else:
+                with self._conn:
+                    updated = self._conn.execute("UPDATE blobs SET last_access = ? WHERE digest = ?",
+                                                 (time.time(), digest)).rowcount
+                    if updated:
+                        return digest
+                    data = zlib.compress(raw, 6)
+                    self._conn.execute("INSERT INTO blobs (digest, data, size, last_access) VALUES (?, ?, ?, ?)",
+                                       (digest, data, len(data), time.time()))
+                self._size += len(data)
+            self._evict(keep=digest)
+        return digest
+
+    def get(self, digest: str) -> Optional[Any]:
+        with self._lock:
+            if self._conn is None:
+                data = self._blobs.get(digest)
+                if data is not None:
+                    self._blobs.move_to_end(digest)
+            else:
+                row = self._conn.execute("SELECT data FROM blobs WHERE digest = ?", (digest,)).fetchone()
+                data = row[0] if row else None
+                if data is not None:
+                    with self._conn:
+                        self._conn.execute("UPDATE blobs SET last_access = ? WHERE digest = ?", (time.time(), digest))
+        if data is None:
+            return None
+        return json.loads(zlib.decompress(data))
+
+    def _evict(self, keep: str):
+        # Despeja os payloads menos usados até caber no limite (o recém-gravado sempre fica)
+        while self._size > self.max_bytes:
+            if self._conn is None:
+                digest = next(iter(self._blobs))
+                if digest == keep:
+                    break
+                self._size -= len(self._blobs.pop(digest))
+                # Vínculos para o payload despejado saem junto
+                for key in self._holders.pop(digest, ()):
+                    self._bindings.pop(key, None)
+            else:
+                row = self._conn.execute(
+                    "SELECT digest, size FROM blobs WHERE digest != ? ORDER BY last_access LIMIT 1", (keep,)
+                ).fetchone()
+                if row is None:
+                    break
+                with self._conn:
+                    self._conn.execute("DELETE FROM blobs WHERE digest = ?", (row[0],))
+                    self._conn.execute("DELETE FROM bindings WHERE digest = ?", (row[0],))
+                self._size -= row[1]
+            self.evictions += 1
+
+    def save(self, session_id: str, name: str, value: Any):
+        if value is None:
+            self.delete(session_id, name)
+            return
+        digest = self.put(value)
+        with self._lock:
+            if self._conn is None:
+                self._unbind((session_id, name))
+                if digest in self._blobs:
+                    self._bindings[(session_id, name)] = digest
+                    self._holders.setdefault(digest, set()).add((session_id, name))
+            else:
+                with self._conn:
+                    self._conn.execute("INSERT OR REPLACE INTO bindings (session_id, name, digest) VALUES (?, ?, ?)",
+                                       (session_id, name, digest))
+
+    def load(self, session_id: str, name: str) -> Optional[Any]:
+        with self._lock:
+            if self._conn is None:
+                digest = self._bindings.get((session_id, name))
+            else:
+                row = self._conn.execute("SELECT digest FROM bindings WHERE session_id = ? AND name = ?",
+                                         (session_id, name)).fetchone()
+                digest = row[0] if row else None
+        if digest is None:
+            return None
+        value = self.get(digest)
+        if value is None:
+            # Payload despejado: a sessão volta ao estado inicial para esse item
+            self.delete(session_id, name)
+        return value
+
+    def touch(self, session_id: str, names) -> bool:
+        # Confere que todos os payloads estão presentes e os marca como usados juntos,
+        # para que o LRU não despeje só parte da sessão (ex: o currículo lido apenas em cliques)
+        with self._lock:
+            if self._conn is None:
+                digests = [self._bindings.get((session_id, name)) for name in names]
+                if any(digest is None or digest not in self._blobs for digest in digests):
+                    return False
+                for digest in digests:
+                    self._blobs.move_to_end(digest)
+            else:
+                rows = self._conn.execute(
+                    f"SELECT b.digest FROM bindings b JOIN blobs USING (digest) "
+                    f"WHERE b.session_id = ? AND b.name IN ({', '.join('?' * len(names))})",
+                    (session_id, *names)
+                ).fetchall()
+                if len(rows) != len(names):
+                    return False
+                with self._conn:
+                    self._conn.executemany("UPDATE blobs SET last_access = ? WHERE digest = ?",
+                                           [(time.time(), row[0]) for row in rows])
+        return True
+
+    def clear(self, session_id: str):
+        with self._lock:
+            if self._conn is None:
+                for key in [key for key in self._bindings if key[0] == session_id]:
+                    self._unbind(key)
+            else:
+                with self._conn:
+                    self._conn.execute("DELETE FROM bindings WHERE session_id = ?", (session_id,))
+
+    def delete(self, session_id: str, name: str):
+        with self._lock:
+            if self._conn is None:
+                self._unbind((session_id, name))
+            else:
+                with self._conn:
+                    self._conn.execute("DELETE FROM bindings WHERE session_id = ? AND name = ?", (session_id, name))
+
+    def _unbind(self, key: tuple):
+        digest = self._bindings.pop(key, None)
+        if digest is not None and digest in self._holders:
+            self._holders[digest].discard(key)
+            if not self._holders[digest]:
+                del self._holders[digest]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._conn is None:
+                blobs, bindings = len(self._blobs), len(self._bindings)
+            else:
+                blobs = self._conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0]
+                bindings = self._conn.execute("SELECT COUNT(*) FROM bindings").fetchone()[0]
+            return {"payloads": blobs, "vinculos": bindings, "bytes": self._size,
+                    "limite_bytes": self.max_bytes, "despejos": self.evictions}
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_session_store() -> SessionStore:
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = SessionStore(
+                max_bytes=int(float(os.getenv('CVISION_SESSION_STORE_MB', '256')) * 1024 * 1024),
+                path=os.getenv('CVISION_SESSION_STORE_PATH')
+            )
+        return _default_store
@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("numpy")
+
+from resume_ranker import tokenize, extract_skills  # noqa: E402
+
+
+def test_slash_separated_stacks_are_split():
+    assert tokenize("Python/Django/Flask, React/Redux") == ['python', 'django', 'flask', 'react', 'redux']
+    assert extract_skills("Python/Django/Flask, React/Redux") == {'python', 'django', 'flask', 'react'}
+    assert extract_skills("AWS/GCP") == {'aws', 'gcp'}
+
+
+def test_slash_aliases_still_match():
+    assert extract_skills("Pipelines de CI/CD, PL/SQL e UI/UX") == {'ci/cd', 'sql', 'ux'}
+
+
+def test_leading_dot_tokens():
+    assert tokenize(".NET Core e ASP.NET/.NET 8") == ['.net', 'core', 'asp.net', '.net']
+    assert extract_skills("Experiência com .NET Core") == {'.net'}
+    assert tokenize("terminei. Depois") == ['terminei', 'depois']
+
+
+def test_dotted_and_symbol_tokens_are_kept():
+    assert extract_skills("Node.js, C#, C++ e T-SQL.") == {'node.js', 'c#', 'c++', 'sql'}
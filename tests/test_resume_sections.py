@@ -0,0 +1,80 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resume_sections import split_sections, chunk_document, diff_sections, change_hunks, change_ratio  # noqa: E402
+
+RESUME = """JOÃO SILVA
+SQL, AWS, GCP
+
+EXPERIÊNCIA
+Dev na ACME (2019-2023)
+
+CERTIFICAÇÕES
+AWS CERTIFIED DEVELOPER
+
+HABILIDADES
+PYTHON, DJANGO, KUBERNETES
+"""
+
+
+def test_caps_lines_that_are_not_known_headings_stay_in_the_body():
+    sections = split_sections(RESUME)
+    assert [s.name for s in sections] == ['cabecalho', 'experiencia', 'certificacoes', 'habilidades']
+    assert sections[0].text == "JOÃO SILVA\nSQL, AWS, GCP"
+    assert sections[2].text == "AWS CERTIFIED DEVELOPER"
+    assert sections[3].text == "PYTHON, DJANGO, KUBERNETES"
+
+
+def test_caps_heading_with_complement_is_recognized():
+    sections = split_sections("EXPERIÊNCIA PROFISSIONAL E ACADÊMICA\nDev na ACME")
+    assert sections[0].name == 'experiencia'
+    assert sections[0].text == "Dev na ACME"
+
+
+def test_heading_without_body_is_kept():
+    sections = split_sections("HABILIDADES\nFORMAÇÃO\nCiência da Computação")
+    assert [(s.name, s.heading, s.text) for s in sections] == [
+        ('habilidades', 'HABILIDADES', ''),
+        ('formacao', 'FORMAÇÃO', 'Ciência da Computação'),
+    ]
+
+
+def test_chunk_document_keeps_every_section():
+    chunks = chunk_document(RESUME)
+    text = "\n".join(chunks)
+    for expected in ("JOÃO SILVA", "Dev na ACME", "AWS CERTIFIED DEVELOPER", "PYTHON, DJANGO, KUBERNETES"):
+        assert expected in text
+
+
+def test_chunk_document_splits_oversized_sections_under_the_limit():
+    body = "\n\n".join(f"Projeto {i}: " + "x" * 200 for i in range(30))
+    chunks = chunk_document(f"PROJETOS\n{body}", max_chars=1000)
+    assert len(chunks) > 1
+    assert all(len(c) <= 1000 and c.startswith("PROJETOS\n") for c in chunks)
+
+
+def test_diff_detects_edits_in_caps_lines():
+    revised = RESUME.replace("AWS CERTIFIED DEVELOPER", "AWS CERTIFIED SOLUTIONS ARCHITECT PROFESSIONAL")
+    changes = diff_sections(RESUME, revised)
+    assert [c.name for c in changes] == ['certificacoes']
+    assert change_hunks(changes[0]) == [("AWS CERTIFIED DEVELOPER", "AWS CERTIFIED SOLUTIONS ARCHITECT PROFESSIONAL")]
+
+
+def test_diff_detects_added_section():
+    original = RESUME.split("HABILIDADES")[0]
+    changes = diff_sections(original, RESUME)
+    assert [c.name for c in changes] == ['habilidades']
+    assert change_hunks(changes[0]) == [("", "HABILIDADES\nPYTHON, DJANGO, KUBERNETES")]
+
+
+def test_typo_fix_counts_only_edited_characters():
+    revised = RESUME.replace("Dev na ACME", "Dev na ACNE")
+    changes = diff_sections(RESUME, revised)
+    assert len(changes) == 1
+    assert change_ratio(changes, RESUME, revised) < 0.01
+
+
+def test_whitespace_only_changes_are_ignored():
+    assert diff_sections(RESUME, RESUME.replace("\n", "\n   ")) == []
@@ -0,0 +1,111 @@
+import os
+import json
+import threading
+import logging
+from collections import deque
+from typing import Dict, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Estimativa inicial por formato de resposta: base + fração da entrada, antes de haver histórico.
+# Nos modelos 2.5 os tokens de raciocínio também consomem maxOutputTokens
+TASK_PRIORS = {
+    "chat": {"base": 1536, "por_token_entrada": 0.0},
+    "analyze_resume": {"base": 4096, "por_token_entrada": 0.15},
+    "analyze_section": {"base": 1536, "por_token_entrada": 0.05},
+    "roadmap": {"base": 4608, "por_token_entrada": 0.05},
+    "extract_chunk": {"base": 1024, "por_token_entrada": 0.25},
+    "update_analysis": {"base": 1536, "por_token_entrada": 0.1},
+    "assess_fit": {"base": 768, "por_token_entrada": 0.0},
+    "*": {"base": 2048, "por_token_entrada": 0.1},
+}
+
+MIN_BUDGET = 256
+
+
+class OutputBudgeter:
+
+    def __init__(self, margin: float = 1.25, min_samples: int = 10, window_size: int = 200,
+                 state_path: str = None):
+        self.margin = margin
+        self.min_samples = min_samples
+        self.window_size = window_size
+        self.state_path = state_path
+        self._samples: Dict[str, deque] = {}
+        self._truncations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if state_path and os.path.exists(state_path):
+            self._load()
+
+    @staticmethod
+    def _keys(task: str, input_tokens: int) -> Tuple[str, str]:
+        # Faixas de tamanho em potências de 2: saídas de trechos grandes tendem a ser maiores
+        return f"{task}:{input_tokens.bit_length()}", task
+
+    def budget(self, task: str, input_tokens: int, ceiling: int) -> Tuple[int, str]:
+        bucket_key, task_key = self._keys(task, input_tokens)
+        with self._lock:
+            for key in (bucket_key, task_key):
+                samples = self._samples.get(key)
+                if samples and len(samples) >= self.min_samples:
+                    ordered = sorted(samples)
+                    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+                    # Truncamentos recentes aumentam a margem
+                    margin = self.margin * (1.5 if self._truncations.get(key, 0) else 1.0)
+                    return max(MIN_BUDGET, min(ceiling, int(p95 * margin))), f"p95 observado ({key})"
+
+        prior = TASK_PRIORS.get(task, TASK_PRIORS["*"])
+        estimate = int(prior["base"] + prior["por_token_entrada"] * input_tokens)
+        return max(MIN_BUDGET, min(ceiling, estimate)), "estimativa inicial"
+
+    def record(self, task: str, input_tokens: int, output_tokens: int, truncated: bool):
+        with self._lock:
+            for key in self._keys(task, input_tokens):
+                if key not in self._samples:
+                    self._samples[key] = deque(maxlen=self.window_size)
+                self._samples[key].append(output_tokens)
+                if truncated:
+                    self._truncations[key] = self._truncations.get(key, 0) + 1
+                elif self._truncations.get(key):
+                    self._truncations[key] -= 1
+        if self.state_path:
+            self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {key: {"amostras": len(samples), "max": max(samples), "truncamentos": self._truncations.get(key, 0)}
+                    for key, samples in self._samples.items() if samples}
+
+    def _load(self):
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Não foi possível carregar o histórico de tokens: {e}")
+            return
+        for key, samples in state.get("samples", {}).items():
+            self._samples[key] = deque(samples, maxlen=self.window_size)
+        self._truncations = state.get("truncations", {})
+
+    def _save(self):
+        with self._lock:
+            state = {"samples": {k: list(v) for k, v in self._samples.items()}, "truncations": dict(self._truncations)}
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            logger.warning(f"Não foi possível salvar o histórico de tokens: {e}")
+
+
+_default_budgeter = None
+_default_budgeter_lock = threading.Lock()
+
+
+def get_default_budgeter() -> OutputBudgeter:
+    global _default_budgeter
+    with _default_budgeter_lock:
+        if _default_budgeter is None:
+            _default_budgeter = OutputBudgeter(state_path=os.getenv('CVISION_BUDGET_STATE'))
+        return _default_budgeter
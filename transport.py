@@ -0,0 +1,252 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import contextvars
+import logging
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Cassete: arquivo JSONL com as trocas HTTP com o Gemini ("exchange") e as operações do agente
+# que as originaram ("operation"), cada uma com o instante relativo ao início da gravação.
+# Currículos e respostas ficam em texto claro: trate cassetes de produção como dados pessoais
+
+
+class CassetteMiss(Exception):
+    pass
+
+
+class NetworkClock:
+    # Tempo de parede com ao menos uma requisição simulada em andamento; chamadas paralelas não somam em dobro
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._busy_since = 0.0
+        self._total = 0.0
+
+    def begin(self):
+        with self._lock:
+            if not self._in_flight:
+                self._busy_since = time.monotonic()
+            self._in_flight += 1
+
+    def end(self):
+        with self._lock:
+            self._in_flight -= 1
+            if not self._in_flight:
+                self._total += time.monotonic() - self._busy_since
+
+    def elapsed(self) -> float:
+        with self._lock:
+            return self._total + (time.monotonic() - self._busy_since if self._in_flight else 0.0)
+
+
+# Relógio da operação atual; propagado às threads do agente por submit_in_context
+_network_clock: contextvars.ContextVar = contextvars.ContextVar("cvision_network_clock", default=None)
+
+
+def submit_in_context(executor, fn: Callable, *args, **kwargs):
+    # Cada tarefa roda numa cópia do contexto de quem submete (um Context não pode ser usado por duas threads)
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def request_keys(model: str, payload: Dict[str, Any]) -> tuple:
+    # maxOutputTokens fica fora da chave: o orçamento adaptativo muda entre execuções
+    config = {k: v for k, v in payload.get("generationConfig", {}).items() if k != "maxOutputTokens"}
+    body = json.dumps({"contents": payload.get("contents"), "generationConfig": config},
+                      ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    fallback = hashlib.sha256(body.encode('utf-8')).hexdigest()
+    return hashlib.sha256(f"{model}\n{body}".encode('utf-8')).hexdigest(), fallback
+
+
+def read_cassette(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Cassete {path}: linha {number} inválida ignorada")
+
+
+class ReplayedResponse:
+    # Subconjunto de requests.Response usado pelo agente
+
+    def __init__(self, status_code: int, data: Any):
+        self.status_code = status_code
+        self._data = data
+
+    @property
+    def text(self) -> str:
+        return self._data if isinstance(self._data, str) else json.dumps(self._data, ensure_ascii=False)
+
+    def json(self) -> Any:
+        if isinstance(self._data, str):
+            return json.loads(self._data)
+        return self._data
+
+    def close(self):
+        pass
+
+
+class RecordingTransport:
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+        self.exchanges = 0
+
+    def _write(self, entry: Dict[str, Any]):
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def _offset(self) -> float:
+        return round(time.monotonic() - self._start, 4)
+
+    def record_operation(self, name: str, arguments: Dict[str, Any]):
+        self._write({"type": "operation", "offset": self._offset(), "name": name, "arguments": arguments})
+
+    def post(self, model: str, payload: Dict[str, Any], timeout: float, send: Callable[[], Any]):
+        import requests
+
+        key, fallback = request_keys(model, payload)
+        entry = {"type": "exchange", "offset": self._offset(), "model": model, "key": key, "fallback_key": fallback}
+        start = time.monotonic()
+        try:
+            response = send()
+        except requests.RequestException as e:
+            entry.update(elapsed=round(time.monotonic() - start, 4),
+                         error={"type": type(e).__name__, "message": str(e)[:500]})
+            self._write(entry)
+            raise
+        entry["elapsed"] = round(time.monotonic() - start, 4)
+        entry["status"] = response.status_code
+        try:
+            entry["response"] = response.json()
+        except ValueError:
+            entry["response"] = response.text
+        self._write(entry)
+        with self._lock:
+            self.exchanges += 1
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        return {"modo": "record", "cassete": self.path, "trocas": self.exchanges}
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class ReplayTransport:
+
+    def __init__(self, path: str, speed: float = 1.0, strict: bool = True):
+        # speed=1 reproduz a latência gravada, speed=10 a divide por 10 e speed=0 responde sem espera
+        self.path = path
+        self.speed = speed
+        self.strict = strict
+        self._lock = threading.Lock()
+        self._by_key: Dict[str, deque] = {}
+        self._by_fallback: Dict[str, deque] = {}
+        self.operations: List[Dict[str, Any]] = []
+        self.counters = {"servidas": 0, "por_chave_sem_modelo": 0, "ausentes": 0}
+        for entry in read_cassette(path):
+            if entry.get("type") == "operation":
+                self.operations.append(entry)
+            elif entry.get("type") == "exchange":
+                self._by_key.setdefault(entry["key"], deque()).append(entry)
+                self._by_fallback.setdefault(entry["fallback_key"], deque()).append(entry)
+        logger.info(f"Cassete carregado: {sum(len(q) for q in self._by_key.values())} trocas, "
+                    f"{len(self.operations)} operações ({path})")
+
+    @staticmethod
+    def _take(queue: Optional[deque]) -> Optional[Dict[str, Any]]:
+        # Trocas repetidas (ex: 429 seguido de 200) saem na ordem gravada e depois recomeçam,
+        # para que o cassete possa ser reproduzido várias vezes na mesma carga
+        if not queue:
+            return None
+        entry = queue.popleft()
+        queue.append(entry)
+        return entry
+
+    def _match(self, model: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key, fallback = request_keys(model, payload)
+        with self._lock:
+            entry = self._take(self._by_key.get(key))
+            if entry is not None:
+                self.counters["servidas"] += 1
+                return entry
+            # O roteador pode escolher outro modelo que o da gravação; a resposta do mesmo pedido serve
+            entry = self._take(self._by_fallback.get(fallback))
+            if entry is not None:
+                self.counters["servidas"] += 1
+                self.counters["por_chave_sem_modelo"] += 1
+                return entry
+            self.counters["ausentes"] += 1
+        return None
+
+    def network_time(self) -> float:
+        # Tempo simulado de rede da operação atual, incluindo chamadas feitas em threads do agente
+        clock = _network_clock.get()
+        return clock.elapsed() if clock is not None else 0.0
+
+    def reset_network_time(self):
+        _network_clock.set(NetworkClock())
+
+    def post(self, model: str, payload: Dict[str, Any], timeout: float, send: Callable[[], Any] = None):
+        import requests
+
+        entry = self._match(model, payload)
+        if entry is None:
+            if self.strict:
+                raise CassetteMiss(f"Requisição para {model} não encontrada no cassete {self.path}")
+            return ReplayedResponse(503, {"error": {"message": "Troca ausente no cassete"}})
+
+        delay = entry.get("elapsed", 0.0) / self.speed if self.speed > 0 else 0.0
+        if delay:
+            clock = _network_clock.get()
+            if clock is not None:
+                clock.begin()
+            try:
+                time.sleep(min(delay, timeout))
+            finally:
+                if clock is not None:
+                    clock.end()
+
+        error = entry.get("error")
+        if error:
+            raise getattr(requests.exceptions, error.get("type", ""), requests.RequestException)(error.get("message"))
+        return ReplayedResponse(entry.get("status", 200), entry.get("response"))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"modo": "replay", "cassete": self.path, "velocidade": self.speed, **self.counters}
+
+
+_default_transport = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport():
+    global _default_transport
+    mode = os.getenv('CVISION_TRANSPORT', '').lower()
+    if mode not in ('record', 'replay'):
+        return None
+    with _default_transport_lock:
+        if _default_transport is None:
+            path = os.getenv('CVISION_CASSETTE', os.path.join('data', 'cassette.jsonl'))
+            if mode == 'record':
+                _default_transport = RecordingTransport(path)
+            else:
+                _default_transport = ReplayTransport(path, speed=float(os.getenv('CVISION_REPLAY_SPEED', '1')))
+        return _default_transport